@@ -1,20 +1,131 @@
-from flask import Flask, render_template, request, send_file, jsonify
+from flask import Flask, render_template, request, send_file, jsonify, url_for, g, Response
 import os
 import steganography
-import tempfile
+import base64
+import jobs
+import metrics
+import io
 import shutil
+import threading
+import time
+import uuid
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB 限制
+# 异步任务：进程池大小、排队和运行中任务数的上限、已完成任务的保留秒数
+app.config['JOB_WORKERS'] = 2
+app.config['JOB_QUEUE_DEPTH'] = 8
+app.config['JOB_TTL'] = 3600
+# 请求目录的保留秒数和清理间隔；异步任务的结果保存在请求目录中，任务过期（JOB_TTL）之前不会被清理
+app.config['UPLOAD_TTL'] = 3600
+app.config['SWEEP_INTERVAL'] = 300
+# 提取结果缓存：内存层的条目数和字节数上限，磁盘层目录（None表示不使用）和字节数上限
+app.config['EXTRACT_CACHE'] = {
+    'max_items': 128,
+    'max_bytes': 64 * 1024 * 1024,
+    'disk_dir': 'cache',
+    'disk_max_bytes': 1024 * 1024 * 1024
+}
 
 # 确保上传目录存在
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# 同一载体重复上传时直接返回缓存的提取结果，异步任务的工作进程共享磁盘层
+steganography.configure_cache(**app.config['EXTRACT_CACHE'])
+
+# 记录各接口和隐写各阶段的耗时，通过/metrics输出
+metrics.describe('stego_request_seconds', '各接口的处理耗时（秒）')
+metrics.describe('stego_stage_seconds', 'Web进程中隐写和提取各阶段的耗时（秒）')
+steganography.add_timing_hook(lambda stage, seconds: metrics.observe('stego_stage_seconds', seconds, stage=stage))
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_timing(response):
+    # 按路由模板统计，避免任务ID等路径参数产生大量标签
+    if 'request_start' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('stego_request_seconds', time.perf_counter() - g.request_start,
+                        route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    # Prometheus文本格式的指标，包括耗时直方图和提取结果缓存的命中情况
+    stats = steganography.cache_stats()
+    extra = [
+        ('stego_cache_hits_total', 'counter', '提取结果缓存的命中次数', {'tier': 'memory'}, stats['memory_hits']),
+        ('stego_cache_hits_total', 'counter', '提取结果缓存的命中次数', {'tier': 'disk'}, stats['disk_hits']),
+        ('stego_cache_misses_total', 'counter', '提取结果缓存的未命中次数', {}, stats['misses']),
+        ('stego_cache_memory_items', 'gauge', '内存缓存的条目数', {}, stats['memory_items']),
+        ('stego_cache_memory_bytes', 'gauge', '内存缓存的字节数', {}, stats['memory_bytes']),
+    ]
+    return Response(metrics.render(extra), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def _wants_async():
+    """请求中带有async=1时以异步任务方式执行"""
+    return (request.form.get('async') or request.args.get('async', '')).lower() in ('1', 'true')
+
+def _request_dir():
+    """为当前请求创建独立的工作目录，同名的并发上传不会互相覆盖"""
+    work_dir = os.path.join(app.config['UPLOAD_FOLDER'], uuid.uuid4().hex)
+    os.makedirs(work_dir)
+    return work_dir
+
+def _save_upload(upload, work_dir, default_name):
+    """将上传文件保存到请求目录，只保留客户端文件名的最后一段"""
+    filename = os.path.basename(upload.filename.replace('\\', '/')) or default_name
+    path = os.path.join(work_dir, filename)
+    upload.save(path)
+    return path
+
+def _in_memory(upload):
+    """按文件头判断上传的载体能否直接在内存中处理（目前只有图片）"""
+    try:
+        return steganography.detect_carrier_type(upload.stream) == '图片'
+    except ValueError:
+        return False
+
+def _remove_dir(work_dir):
+    """删除请求目录"""
+    try:
+        shutil.rmtree(work_dir)
+    except Exception as e:
+        app.logger.warning("清理临时文件时出错: %s", e)
+
+def _scoped(response, work_dir):
+    """响应发送完毕后删除请求目录"""
+    # send_file的响应默认直接交给服务器发送，不会触发call_on_close注册的回调
+    response.direct_passthrough = False
+    response.call_on_close(lambda: _remove_dir(work_dir))
+    return response
+
+# 异步任务ID -> 请求目录，任务过期之前清理线程跳过这些目录
+_job_dirs = {}
+_job_dirs_lock = threading.Lock()
+
+def _submit_job(work_dir, kind, func_name, *args, **kwargs):
+    """提交异步任务，立即返回任务ID和状态查询地址；请求目录保留到任务过期后由清理线程删除"""
+    jobs.configure(app.config['JOB_WORKERS'], app.config['JOB_QUEUE_DEPTH'], app.config['JOB_TTL'], app.config['EXTRACT_CACHE'])
+    try:
+        job_id = jobs.submit(kind, func_name, *args, **kwargs)
+    except RuntimeError as e:
+        _remove_dir(work_dir)
+        return jsonify({'success': False, 'message': str(e)}), 429
+    with _job_dirs_lock:
+        _job_dirs[job_id] = os.path.abspath(work_dir)
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id)
+    }), 202
+
 @app.route('/encode', methods=['POST'])
 def encode():
     # 获取载体文件类型
@@ -28,45 +139,58 @@ def encode():
     # 获取秘密信息类型
     secret_type = request.form.get('secret_type')
     
-    # 临时保存载体文件
-    carrier_path = os.path.join(app.config['UPLOAD_FOLDER'], carrier_file.filename)
-    carrier_file.save(carrier_path)
-    
-    # 处理秘密信息
+    # 先检查秘密信息，再保存上传文件
     if secret_type == '文本':
         secret_text = request.form.get('secret_text')
         if not secret_text:
             return jsonify({'success': False, 'message': '请输入要隐藏的文本'})
-        
-        # 生成输出文件名
-        output_filename = f"hidden_{carrier_file.filename}"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
-        
-        # 执行隐写
-        try:
-            steganography.hide_text(carrier_path, output_path, secret_text, carrier_type)
-            return send_file(output_path, as_attachment=True, download_name=output_filename)
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'隐写失败: {str(e)}'})
     else:  # 文件类型
         secret_file = request.files.get('secret_file')
         if not secret_file:
             return jsonify({'success': False, 'message': '请上传要隐藏的文件'})
-        
-        # 临时保存秘密文件
-        secret_path = os.path.join(app.config['UPLOAD_FOLDER'], secret_file.filename)
-        secret_file.save(secret_path)
-        
-        # 生成输出文件名
-        output_filename = f"hidden_{carrier_file.filename}"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
-        
-        # 执行隐写
+    
+    # 可选的密码和口令，提供密码时按密码打乱嵌入位置，提供口令时加密载荷
+    password = request.form.get('password') or None
+    passphrase = request.form.get('passphrase') or None
+    
+    work_dir = _request_dir()
+    if secret_type == '文本':
+        func_name, secret = 'hide_text', secret_text
+    else:
+        # 秘密文件保持原文件名（文件名会一起封装进容器），单独放在子目录中以免与载体重名
+        secret_dir = os.path.join(work_dir, 'secret')
+        os.makedirs(secret_dir)
+        func_name, secret = 'hide_file', _save_upload(secret_file, secret_dir, 'secret')
+    
+    if not _wants_async() and _in_memory(carrier_file):
+        # 同步处理图片载体时直接在内存中隐写，载体和生成的PNG都不写入磁盘
+        name = os.path.splitext(os.path.basename(carrier_file.filename.replace('\\', '/')))[0] or 'carrier'
         try:
-            steganography.hide_file(carrier_path, output_path, secret_path, carrier_type)
-            return send_file(output_path, as_attachment=True, download_name=output_filename)
+            png = getattr(steganography, func_name)(carrier_file.stream, None, secret, carrier_type,
+                                                    compression='auto', password=password, passphrase=passphrase)
+            return _scoped(send_file(io.BytesIO(png), as_attachment=True, download_name=f"hidden_{name}.png",
+                                     mimetype='image/png'), work_dir)
         except Exception as e:
-            return jsonify({'success': False, 'message': f'隐写失败: {str(e)}'})
+            return _scoped(jsonify({'success': False, 'message': f'隐写失败: {str(e)}'}), work_dir)
+    
+    # 内存映射和OpenCV需要真实文件，载体保存到本次请求独立的目录中
+    carrier_path = _save_upload(carrier_file, work_dir, 'carrier')
+    
+    # 生成输出文件名
+    output_path = os.path.join(work_dir, f"hidden_{os.path.basename(carrier_path)}")
+    
+    if _wants_async():
+        return _submit_job(work_dir, 'encode', func_name, carrier_path, output_path, secret, carrier_type,
+                           compression='auto', password=password, passphrase=passphrase)
+    
+    # 执行隐写
+    try:
+        # 图片会保存为PNG、视频会保存为无损AVI，以实际保存的文件为准
+        output_path = getattr(steganography, func_name)(carrier_path, output_path, secret, carrier_type,
+                                                        compression='auto', password=password, passphrase=passphrase)
+        return _scoped(send_file(output_path, as_attachment=True, download_name=os.path.basename(output_path)), work_dir)
+    except Exception as e:
+        return _scoped(jsonify({'success': False, 'message': f'隐写失败: {str(e)}'}), work_dir)
 
 @app.route('/decode', methods=['POST'])
 def decode():
@@ -78,64 +202,135 @@ def decode():
     if carrier_file.filename == '':
         return jsonify({'success': False, 'message': '未选择载体文件'})
     
+    password = request.form.get('password') or None
+    passphrase = request.form.get('passphrase') or None
+    # 上传的数据已在内存或临时文件中（不超过MAX_CONTENT_LENGTH），只计算一次哈希，
+    # 无论在内存中提取还是保存为文件后提取，同一载体再次上传时都命中提取结果缓存
+    digest = steganography.carrier_digest(carrier_file.stream)
+    
+    if not _wants_async() and _in_memory(carrier_file):
+        # 同步提取图片载体时直接读取上传的数据，不写入磁盘
+        try:
+            return _extract_response(steganography.extract(carrier_file.stream, password=password, passphrase=passphrase,
+                                                            digest=digest))
+        except Exception as e:
+            return jsonify({'success': False, 'message': f'提取失败: {str(e)}'})
+    
     # 保存载体文件
-    carrier_path = os.path.join(app.config['UPLOAD_FOLDER'], carrier_file.filename)
-    carrier_file.save(carrier_path)
+    work_dir = _request_dir()
+    carrier_path = _save_upload(carrier_file, work_dir, 'carrier')
+    
+    if _wants_async():
+        return _submit_job(work_dir, 'decode', 'extract', carrier_path, password=password, passphrase=passphrase,
+                           digest=digest)
     
     try:
         # 提取隐藏信息
-        result = steganography.extract(carrier_path)
-        
-        # 根据结果类型返回不同的响应
-        if isinstance(result, dict):
-            if result['type'] == 'file':
-                # 创建临时文件
-                temp_dir = tempfile.mkdtemp()
-                filename = result.get('filename', 'extracted_file')
-                temp_file_path = os.path.join(temp_dir, filename)
-                
-                # 保存提取的文件
-                with open(temp_file_path, 'wb') as f:
-                    f.write(result['data'])
-                
-                # 返回文件下载
-                response = send_file(
-                    temp_file_path,
-                    as_attachment=True,
-                    download_name=filename,
-                    mimetype='application/octet-stream'
-                )
-                
-                # 设置回调以在请求完成后删除临时文件
-                @response.call_on_close
-                def cleanup():
-                    try:
-                        shutil.rmtree(temp_dir)
-                    except Exception as e:
-                        print(f"清理临时文件时出错: {e}")
-                
-                return response
-            else:  # 文本类型
-                return jsonify({
-                    'success': True,
-                    'type': 'text',
-                    'data': result['data']
-                })
-        else:
-            # 兼容旧版本的返回格式
+        return _scoped(_extract_response(steganography.extract(carrier_path, password=password, passphrase=passphrase,
+                                                               digest=digest)), work_dir)
+    except Exception as e:
+        return _scoped(jsonify({'success': False, 'message': f'提取失败: {str(e)}'}), work_dir)
+
+def _extract_response(result):
+    """根据提取结果的类型返回不同的响应"""
+    if isinstance(result, dict):
+        if result['type'] == 'file':
+            # 提取出的文件已在内存中，直接作为响应发送，不再写入临时文件
+            return send_file(
+                io.BytesIO(result['data']),
+                as_attachment=True,
+                download_name=result.get('filename') or 'extracted_file',
+                mimetype='application/octet-stream'
+            )
+        elif result['type'] == 'records':
+            # 多条记录逐条返回，文件记录的内容以Base64编码
+            return jsonify({
+                'success': True,
+                'type': 'records',
+                'records': [
+                    {'type': 'file', 'filename': record['filename'], 'data': base64.b64encode(record['data']).decode('ascii')}
+                    if record['type'] == 'file' else {'type': 'text', 'data': record['data']}
+                    for record in result['records']
+                ]
+            })
+        else:  # 文本类型
             return jsonify({
                 'success': True,
                 'type': 'text',
-                'data': result
+                'data': result['data']
             })
-    except Exception as e:
-        return jsonify({'success': False, 'message': f'提取失败: {str(e)}'})
+    else:
+        # 兼容旧版本的返回格式
+        return jsonify({
+            'success': True,
+            'type': 'text',
+            'data': result
+        })
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    # 查询异步任务的状态和进度（已写入的位数或已处理的帧数）
+    info = jobs.status(job_id)
+    if info is None:
+        return jsonify({'success': False, 'message': '任务不存在或已过期'}), 404
+    
+    response = {key: info[key] for key in ('id', 'kind', 'state', 'progress', 'error')}
+    response['success'] = info['state'] != 'failed'
+    if info['state'] == 'done':
+        response['result_url'] = url_for('job_result', job_id=job_id)
+    return jsonify(response)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    # 返回已完成任务的结果，格式与同步调用/encode、/decode时相同
+    info = jobs.status(job_id)
+    if info is None:
+        return jsonify({'success': False, 'message': '任务不存在或已过期'}), 404
+    if info['state'] == 'failed':
+        action = '隐写' if info['kind'] == 'encode' else '提取'
+        return jsonify({'success': False, 'message': f"{action}失败: {info['error']}"})
+    if info['state'] != 'done':
+        return jsonify({'success': False, 'message': '任务尚未完成', 'state': info['state']}), 409
+    
+    if info['kind'] == 'encode':
+        output_path = info['result']
+        if not os.path.exists(output_path):
+            return jsonify({'success': False, 'message': '任务结果已被清理'}), 410
+        return send_file(output_path, as_attachment=True, download_name=os.path.basename(output_path))
+    return _extract_response(info['result'])
 
 # 清理临时文件
-@app.after_request
-def cleanup(response):
-    # 这里可以添加定期清理上传文件夹的逻辑
-    return response
+def _sweep_uploads():
+    """定期删除上传目录中超过保留时间的请求目录，尚未过期的异步任务的目录除外"""
+    while True:
+        time.sleep(app.config['SWEEP_INTERVAL'])
+        deadline = time.time() - app.config['UPLOAD_TTL']
+        live_ids = jobs.job_ids()
+        with _job_dirs_lock:
+            for job_id in list(_job_dirs):
+                if job_id not in live_ids:
+                    del _job_dirs[job_id]
+            live_dirs = set(_job_dirs.values())
+        for entry in os.scandir(app.config['UPLOAD_FOLDER']):
+            try:
+                if entry.stat().st_mtime >= deadline or os.path.abspath(entry.path) in live_dirs:
+                    continue
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
+            except OSError as e:
+                app.logger.warning("清理临时文件时出错: %s", e)
+
+_sweeper = None
+
+@app.before_request
+def start_sweeper():
+    # 在第一次请求时启动清理线程
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = threading.Thread(target=_sweep_uploads, daemon=True)
+        _sweeper.start()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
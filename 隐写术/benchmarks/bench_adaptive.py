@@ -0,0 +1,90 @@
+"""自适应嵌入基准测试：比较顺序嵌入和按纹理自适应嵌入在大图片上的吞吐量，以及写入平坦区域的比例
+
+用法: python benchmarks/bench_adaptive.py [--full] [--repeat 次数] [--json 输出文件]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import steganography
+
+# 默认规模和--full规模（百万像素）
+QUICK = [1, 4, 16]
+FULL = [1, 4, 16, 64]
+# 载荷占图片每通道1位容量的比例
+PAYLOAD_RATIO = 0.25
+
+
+def make_cover(megapixels, rng):
+    """合成左半边为平滑渐变（平坦区域）、右半边为噪声纹理的RGB图片"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(megapixels * 1e6 / width)
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    half = width // 2
+    pixels[:, :half] = (np.arange(height, dtype=np.uint32) * 200 // height)[:, None, None]
+    pixels[:, half:] = rng.integers(0, 256, (height, width - half, 3), dtype=np.uint8)
+    return pixels
+
+
+def best_time(func, repeat):
+    """多次运行取最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(scale, repeat):
+    results = []
+    rng = np.random.default_rng(0)
+    for megapixels in scale:
+        cover = make_cover(megapixels, rng)
+        secret = rng.bytes(int(cover.size * PAYLOAD_RATIO) // 16).hex()
+        half = cover.shape[1] // 2
+        for mode, options in (('顺序', {}), ('自适应', {'adaptive': True}), ('自适应2位', {'adaptive': True, 'bits': 2})):
+            hide_seconds, stego = best_time(
+                lambda: steganography.hide_text(cover, None, secret, '图片', **options), repeat)
+            extract_seconds, _ = best_time(lambda: steganography.extract(stego), repeat)
+            changed = np.any(stego != cover, axis=2)
+            results.append({
+                'megapixels': megapixels,
+                'mode': mode,
+                'payload_bytes': len(secret),
+                'hide_seconds': hide_seconds,
+                'extract_seconds': extract_seconds,
+                'hide_mp_s': megapixels / hide_seconds,
+                'extract_mp_s': megapixels / extract_seconds,
+                # 被修改的像素中位于平坦区域的比例
+                'flat_share': float(changed[:, :half].sum() / max(changed.sum(), 1)),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--full', action='store_true', help='加入64百万像素的图片')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测试的重复次数')
+    parser.add_argument('--json', help='将结果保存为JSON文件')
+    args = parser.parse_args()
+
+    results = run(FULL if args.full else QUICK, args.repeat)
+    print(f"{'百万像素':<8}{'模式':<10}{'隐写s':>8}{'提取s':>8}{'隐写MP/s':>10}{'提取MP/s':>10}{'平坦区域':>10}")
+    for r in results:
+        print(f"{r['megapixels']:<8}{r['mode']:<10}{r['hide_seconds']:>8.2f}{r['extract_seconds']:>8.2f}"
+              f"{r['hide_mp_s']:>10.1f}{r['extract_mp_s']:>10.1f}{r['flat_share']:>10.1%}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
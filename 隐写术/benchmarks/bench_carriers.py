@@ -0,0 +1,227 @@
+"""载体隐写基准测试：合成不同大小的图片、音频和视频载体，测量隐写和提取的吞吐量与峰值内存
+
+用法: python benchmarks/bench_carriers.py [--full] [--repeat 次数] [--json 输出文件] [--compare 基准JSON]
+"""
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import steganography
+
+try:
+    import resource
+except ImportError:
+    # Windows上没有resource模块，不统计峰值内存
+    resource = None
+
+# 默认规模和--full规模：图片为百万像素数，音频为秒数，视频为(宽, 高, 帧数)
+QUICK = {
+    'image': [0.1, 1, 10],
+    'audio': [1, 60, 600],
+    'video': [(320, 240, 30), (640, 480, 60)],
+}
+FULL = {
+    'image': [0.1, 1, 10, 50],
+    'audio': [1, 60, 600, 3600],
+    'video': [(320, 240, 30), (640, 480, 60), (1280, 720, 120)],
+}
+PAYLOAD_SIZES = [1 << 10, 64 << 10, 1 << 20]
+SAMPLE_RATE = 44100
+
+
+def make_image(path, megapixels, rng):
+    """合成带噪声的渐变图片，比纯随机像素更接近真实照片的压缩率"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(megapixels * 1e6 / width)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None] * np.ones((height, 1, 3), np.float32)
+    noise = rng.integers(0, 16, (height, width, 3), dtype=np.uint8)
+    pixels = (gradient.astype(np.uint8) // 2 + noise)
+    Image.fromarray(pixels).save(path, compress_level=1)
+
+
+def make_audio(path, seconds, rng):
+    """合成16位立体声WAV"""
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        # 分段写入，合成一小时的音频时内存占用也很小
+        for start in range(0, int(seconds * SAMPLE_RATE), SAMPLE_RATE * 10):
+            frames = min(SAMPLE_RATE * 10, int(seconds * SAMPLE_RATE) - start)
+            f.writeframes(rng.integers(-8000, 8000, (frames, 2), dtype=np.int16).tobytes())
+
+
+def make_video(path, size, rng):
+    """合成无损编码的AVI视频，需要opencv-python"""
+    import cv2
+    width, height, frames = size
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'FFV1'), 25, (width, height))
+    for _ in range(frames):
+        out.write(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    out.release()
+
+
+def make_carriers(scale, work_dir):
+    """生成所有测试载体，返回(名称, 载体类型, 路径, 文件字节数)的列表"""
+    rng = np.random.default_rng(0)
+    carriers = []
+    for megapixels in scale['image']:
+        for ext in ('.png', '.bmp', '.tif'):
+            path = os.path.join(work_dir, f"image_{megapixels}mp{ext}")
+            make_image(path, megapixels, rng)
+            carriers.append((f"{ext[1:]} {megapixels}MP", '图片', path))
+    for seconds in scale['audio']:
+        path = os.path.join(work_dir, f"audio_{seconds}s.wav")
+        make_audio(path, seconds, rng)
+        carriers.append((f"wav {seconds}s", '音频', path))
+    try:
+        for size in scale['video']:
+            path = os.path.join(work_dir, f"video_{size[0]}x{size[1]}x{size[2]}.avi")
+            make_video(path, size, rng)
+            carriers.append((f"avi {size[0]}x{size[1]}x{size[2]}", '视频', path))
+    except ImportError:
+        print("未安装opencv-python，跳过视频测试")
+    return [(name, carrier_type, path, os.path.getsize(path)) for name, carrier_type, path in carriers]
+
+
+def peak_rss():
+    """返回当前进程的峰值常驻内存（字节），不支持时返回None"""
+    # Linux上ru_maxrss会继承父进程的峰值，优先读取只统计本进程的VmHWM
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux上单位为KB，macOS上为字节
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure(operation, carrier_type, carrier_path, output_path, secret_path, repeat):
+    """在独立的子进程中执行一项操作，返回(最短耗时, 峰值内存, 相对导入后的内存增量)"""
+    baseline = peak_rss()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if operation == 'hide':
+            steganography.hide_file(carrier_path, output_path, secret_path, carrier_type)
+        else:
+            steganography.extract(output_path, use_cache=False)
+        best = min(best, time.perf_counter() - start)
+    peak = peak_rss()
+    return best, peak, peak - baseline if peak is not None else None
+
+
+def run_isolated(*args):
+    """每项操作使用新的子进程，峰值内存不受之前操作的影响"""
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(measure, *args).result()
+
+
+def run(scale, payload_sizes, repeat, work_dir):
+    results = []
+    rng = np.random.default_rng(1)
+    for name, carrier_type, carrier_path, carrier_bytes in make_carriers(scale, work_dir):
+        capacity = steganography.api._carrier_slots(carrier_path) // 8
+        for payload_size in payload_sizes:
+            # 留出容器头的空间，超出载体容量的组合跳过
+            if payload_size + 1024 > capacity:
+                continue
+            secret_path = os.path.join(work_dir, f"payload_{payload_size}.bin")
+            with open(secret_path, 'wb') as f:
+                f.write(rng.integers(0, 256, payload_size, dtype=np.uint8).tobytes())
+            output_path = os.path.join(work_dir, 'stego_' + os.path.basename(carrier_path))
+            # 图片会保存为PNG（未压缩的BMP和TIFF保持原格式），视频会保存为AVI
+            if carrier_type == '图片' and not output_path.endswith(('.bmp', '.tif')):
+                output_path = os.path.splitext(output_path)[0] + '.png'
+
+            for operation in ('hide', 'extract'):
+                seconds, peak, delta = run_isolated(operation, carrier_type, carrier_path, output_path, secret_path, repeat)
+                results.append({
+                    'carrier': name,
+                    'operation': operation,
+                    'carrier_bytes': carrier_bytes,
+                    'payload_bytes': payload_size,
+                    'seconds': seconds,
+                    'payload_mb_s': payload_size / seconds / 1e6,
+                    'carrier_mb_s': carrier_bytes / seconds / 1e6,
+                    'peak_rss_mb': peak / 1e6 if peak is not None else None,
+                    'rss_delta_mb': delta / 1e6 if delta is not None else None,
+                })
+            os.remove(output_path)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """与之前保存的结果比较，打印耗时变慢超过threshold倍的项目，返回退化项目数"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {
+            (r['carrier'], r['operation'], r['payload_bytes']): r for r in json.load(f)['results']
+        }
+    regressions = 0
+    for r in results:
+        old = baseline.get((r['carrier'], r['operation'], r['payload_bytes']))
+        if old is None:
+            continue
+        ratio = r['seconds'] / old['seconds']
+        if ratio > threshold:
+            regressions += 1
+            print(f"性能退化: {r['carrier']} {r['operation']} {r['payload_bytes']}字节 "
+                  f"{old['seconds']:.4f}s -> {r['seconds']:.4f}s ({ratio:.2f}倍)")
+    print(f"与{baseline_path}相比，共有{regressions}项性能退化")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--full', action='store_true', help='包含50MP图片、一小时音频和720p视频')
+    parser.add_argument('--payload', type=int, nargs='+', default=PAYLOAD_SIZES, help='载荷字节数')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测试的重复次数')
+    parser.add_argument('--json', help='将结果保存为JSON文件')
+    parser.add_argument('--compare', help='与之前保存的JSON结果比较')
+    parser.add_argument('--threshold', type=float, default=1.2, help='耗时超过基准的倍数时视为性能退化')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run(FULL if args.full else QUICK, args.payload, args.repeat, work_dir)
+
+    print(f"{'载体':<20}{'操作':<9}{'载荷字节':>10}{'耗时s':>10}{'载荷MB/s':>10}{'载体MB/s':>10}{'峰值内存MB':>12}")
+    for r in results:
+        peak = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else '-'
+        print(f"{r['carrier']:<20}{r['operation']:<9}{r['payload_bytes']:>10}{r['seconds']:>10.4f}"
+              f"{r['payload_mb_s']:>10.2f}{r['carrier_mb_s']:>10.1f}{peak:>12}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'full': args.full,
+                'results': results,
+            }, f, ensure_ascii=False, indent=2)
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
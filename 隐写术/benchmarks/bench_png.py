@@ -0,0 +1,82 @@
+"""PNG输出基准测试：比较隐写后保存PNG时各压缩级别和压缩策略的编码耗时与文件大小
+
+用法: python benchmarks/bench_png.py [--size 边长] [--repeat 次数] [--json 输出文件]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import steganography
+
+LEVELS = [1, 3, 6, 9]
+STRATEGIES = ['default', 'filtered', 'huffman', 'rle']
+
+
+def make_cover(size, seed=0):
+    """生成接近照片的载体：平滑的渐变加上少量噪声，返回PNG文件的字节串"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / size
+    base = np.stack([x, y, (x + y) / 2], axis=-1) * 200 + 20
+    pixels = np.clip(base + rng.normal(0, 4, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def best_time(func, repeat):
+    """多次运行取最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(size, repeat):
+    cover = make_cover(size)
+    # 隐藏约占一半容量的文本，使最低位中既有隐藏数据也有原始噪声
+    secret = os.urandom(size * size * 3 // 32).hex()
+    results = []
+    for level in LEVELS:
+        for strategy in STRATEGIES:
+            steganography.configure_png(compress_level=level, strategy=strategy)
+            seconds, png = best_time(lambda: steganography.hide_text(cover, None, secret, '图片'), repeat)
+            results.append({
+                'compress_level': level,
+                'strategy': strategy,
+                'bytes': len(png),
+                'ratio': len(png) / len(cover),
+                'seconds': seconds,
+            })
+    steganography.configure_png()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1024, help='载体图片的边长（像素）')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测试的重复次数')
+    parser.add_argument('--json', help='将结果保存为JSON文件')
+    args = parser.parse_args()
+
+    results = run(args.size, args.repeat)
+    print(f"{'级别':<6}{'策略':<10}{'文件字节':>12}{'相对载体':>10}{'耗时ms':>10}")
+    for r in results:
+        print(f"{r['compress_level']:<6}{r['strategy']:<10}{r['bytes']:>12}{r['ratio']:>10.3f}{r['seconds'] * 1000:>10.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
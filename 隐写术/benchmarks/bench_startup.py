@@ -0,0 +1,135 @@
+"""启动耗时基准测试：在全新的解释器中测量导入、命令行和各类载体首次提取的耗时，以及加载了哪些重量级依赖
+
+用法: python benchmarks/bench_startup.py [--repeat 次数] [--json 输出文件]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import steganography
+
+# 统计是否被加载的重量级依赖
+HEAVY_MODULES = ['numpy', 'PIL', 'cv2', 'flask', 'concurrent.futures', 'cryptography']
+
+# 子进程中执行的测试代码：body在计时范围内，结束后输出耗时和已加载的依赖
+CHILD = '''
+import sys, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+import json
+print(json.dumps({{'seconds': elapsed, 'modules': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def make_carriers(work_dir):
+    """生成隐藏了文本的小型载体，返回{场景名: 载体路径}"""
+    rng = np.random.default_rng(0)
+    carriers = {}
+    cover = os.path.join(work_dir, 'cover.png')
+    Image.fromarray(rng.integers(0, 256, (256, 256, 3), dtype=np.uint8)).save(cover)
+    carriers['extract png'] = steganography.hide_text(cover, os.path.join(work_dir, 'stego.png'), '启动测试', '图片')
+
+    cover = os.path.join(work_dir, 'cover.wav')
+    with wave.open(cover, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(rng.integers(-8000, 8000, (44100, 2), dtype=np.int16).tobytes())
+    carriers['extract wav'] = steganography.hide_text(cover, os.path.join(work_dir, 'stego.wav'), '启动测试', '音频')
+
+    try:
+        import cv2
+    except ImportError:
+        print("未安装opencv-python，跳过视频测试")
+        return carriers
+    cover = os.path.join(work_dir, 'cover.avi')
+    out = cv2.VideoWriter(cover, cv2.VideoWriter_fourcc(*'FFV1'), 25, (160, 120))
+    for _ in range(10):
+        out.write(rng.integers(0, 256, (120, 160, 3), dtype=np.uint8))
+    out.release()
+    carriers['extract avi'] = steganography.hide_text(cover, os.path.join(work_dir, 'stego.avi'), '启动测试', '视频')
+    return carriers
+
+
+def scenarios(carriers):
+    """返回(场景名, 子进程中执行的代码)的列表"""
+    items = [
+        ('python', 'pass'),
+        ('import steganography', 'import steganography'),
+        ('cli --help', (
+            "import contextlib, io, runpy\n"
+            "sys.argv = ['steganography', '--help']\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    try:\n"
+            "        runpy.run_module('steganography', run_name='__main__')\n"
+            "    except SystemExit:\n"
+            "        pass"
+        )),
+    ]
+    for name, path in carriers.items():
+        items.append((name, f"import steganography\nsteganography.extract({path!r}, use_cache=False)"))
+    # Web后端在导入时会创建上传目录，在临时目录中运行
+    items.append(('import app', 'import app'))
+    return items
+
+
+def run_child(body, cwd):
+    """在新的解释器中执行一次测试代码，返回(进程总耗时, 代码耗时, 已加载的依赖)"""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD.format(body=body, heavy=HEAVY_MODULES)],
+                            cwd=cwd, env=env, capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - start
+    report = json.loads(output.strip().splitlines()[-1])
+    return wall, report['seconds'], report['modules']
+
+
+def run(repeat, work_dir):
+    results = []
+    for name, body in scenarios(make_carriers(work_dir)):
+        try:
+            runs = [run_child(body, work_dir) for _ in range(repeat)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name}失败，跳过: {e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e}")
+            continue
+        results.append({
+            'scenario': name,
+            'wall_seconds': min(wall for wall, _, _ in runs),
+            'seconds': min(seconds for _, seconds, _ in runs),
+            'modules': runs[0][2],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='每项测试的重复次数')
+    parser.add_argument('--json', help='将结果保存为JSON文件')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run(args.repeat, work_dir)
+
+    print(f"{'场景':<24}{'进程耗时ms':>12}{'代码耗时ms':>12}  已加载的依赖")
+    for r in results:
+        print(f"{r['scenario']:<24}{r['wall_seconds'] * 1000:>12.1f}{r['seconds'] * 1000:>12.1f}  {', '.join(r['modules']) or '-'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
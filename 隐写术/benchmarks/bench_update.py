@@ -0,0 +1,122 @@
+"""原地更新基准测试：比较重新隐写整个载荷、原地修改1字节和追加一条记录在大WAV和BMP载体上的耗时
+
+用法: python benchmarks/bench_update.py [--full] [--payload 字节数] [--repeat 次数] [--json 输出文件]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import steganography
+
+# 默认规模和--full规模：音频为秒数，图片为百万像素数
+QUICK = {'audio': [120, 600], 'image': [4, 16]}
+FULL = {'audio': [120, 600, 3600], 'image': [4, 16, 64]}
+PAYLOAD_SIZE = 1 << 20
+SAMPLE_RATE = 44100
+
+
+def make_audio(path, seconds, rng):
+    """合成16位立体声WAV"""
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        for start in range(0, int(seconds * SAMPLE_RATE), SAMPLE_RATE * 10):
+            frames = min(SAMPLE_RATE * 10, int(seconds * SAMPLE_RATE) - start)
+            f.writeframes(rng.integers(-8000, 8000, (frames, 2), dtype=np.int16).tobytes())
+
+
+def make_image(path, megapixels, rng):
+    """合成带噪声的24位BMP"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(megapixels * 1e6 / width)
+    Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)).save(path)
+
+
+def best_time(func, repeat):
+    """多次运行取最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(scale, payload_size, repeat, work_dir):
+    results = []
+    rng = np.random.default_rng(0)
+    carriers = []
+    for seconds in scale['audio']:
+        path = os.path.join(work_dir, f"audio_{seconds}s.wav")
+        make_audio(path, seconds, rng)
+        carriers.append((f"wav {seconds}s", path))
+    for megapixels in scale['image']:
+        path = os.path.join(work_dir, f"image_{megapixels}mp.bmp")
+        make_image(path, megapixels, rng)
+        carriers.append((f"bmp {megapixels}MP", path))
+
+    # 两个只相差中间1字节的载荷，轮流写入，保证每次更新都有改动
+    payload = bytearray(rng.bytes(payload_size))
+    versions = []
+    for index in range(2):
+        payload[payload_size // 2] = index
+        versions.append(os.path.join(work_dir, f"payload_{index}.bin"))
+        with open(versions[-1], 'wb') as f:
+            f.write(payload)
+
+    for name, carrier_path in carriers:
+        stego_path = os.path.join(work_dir, 'stego_' + os.path.basename(carrier_path))
+        turn = iter(range(1 << 30))
+        timings = {
+            '重新隐写': best_time(lambda: steganography.hide_file(carrier_path, stego_path, versions[0]), repeat),
+            '修改1字节': best_time(lambda: steganography.update_file(stego_path, versions[next(turn) % 2 ^ 1]), repeat),
+        }
+        # 第一次追加把原有载荷转换为多记录容器，不计入耗时
+        steganography.append_text(stego_path, 'record')
+        timings['追加记录'] = best_time(lambda: steganography.append_text(stego_path, 'record'), repeat)
+        for operation, seconds in timings.items():
+            results.append({
+                'carrier': name,
+                'operation': operation,
+                'carrier_bytes': os.path.getsize(carrier_path),
+                'payload_bytes': payload_size,
+                'seconds': seconds,
+                'speedup': timings['重新隐写'] / seconds,
+            })
+        os.remove(stego_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--full', action='store_true', help='包含一小时音频和64百万像素的图片')
+    parser.add_argument('--payload', type=int, default=PAYLOAD_SIZE, help='隐藏的文件字节数')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测试的重复次数')
+    parser.add_argument('--json', help='将结果保存为JSON文件')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = run(FULL if args.full else QUICK, args.payload, args.repeat, work_dir)
+
+    print(f"{'载体':<14}{'操作':<10}{'载体MB':>10}{'耗时s':>10}{'加速比':>8}")
+    for r in results:
+        print(f"{r['carrier']:<14}{r['operation']:<10}{r['carrier_bytes'] / 1e6:>10.1f}{r['seconds']:>10.4f}"
+              f"{r['speedup']:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import concurrent.futures
+import multiprocessing
+import threading
+import time
+import uuid
+import steganography
+
+# 任务表及其锁，任务表只保存在Web进程中
+_lock = threading.Lock()
+_jobs = {}
+# 进程池和跨进程共享的进度表，在第一次提交任务时创建
+_executor = None
+_manager = None
+_progress = None
+_config = {'workers': 2, 'max_pending': 8, 'ttl': 3600, 'cache': {}}
+
+def configure(workers=2, max_pending=8, ttl=3600, cache=None):
+    """设置任务队列：workers为进程池大小，max_pending为排队和运行中任务数的上限，ttl为已完成任务的保留秒数
+
+    cache为工作进程中调用steganography.configure_cache的参数。max_pending和ttl立即生效；进程池已经创建后
+    workers或cache改变时，之后的任务提交到按新设置创建的进程池，已提交的任务在原来的进程池中执行完毕后原进程池退出。
+    """
+    global _executor
+    with _lock:
+        rebuild = _executor is not None and (workers, cache or {}) != (_config['workers'], _config['cache'])
+        _config.update(workers=workers, max_pending=max_pending, ttl=ttl, cache=cache or {})
+        if rebuild:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+def _init_worker(cache):
+    """工作进程启动时按Web进程的设置配置提取结果缓存"""
+    steganography.configure_cache(**cache)
+
+def _ensure_executor():
+    """按当前配置创建进程池和进度表，重建进程池时沿用原来的进度表"""
+    global _executor, _manager, _progress
+    if _manager is None:
+        _manager = multiprocessing.Manager()
+        _progress = _manager.dict()
+    if _executor is None:
+        _executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=_config['workers'], initializer=_init_worker, initargs=(_config['cache'],))
+    return _executor
+
+def _run_job(job_id, progress, func_name, args, kwargs):
+    """在工作进程中执行任务，并把进度写入共享的进度表"""
+    def report(stage, done, total):
+        progress[job_id] = {'stage': stage, 'done': done, 'total': total}
+
+    steganography.set_progress_callback(report)
+    try:
+        return getattr(steganography, func_name)(*args, **kwargs)
+    finally:
+        steganography.set_progress_callback(None)
+
+def _prune():
+    """删除超过保留时间的已完成任务"""
+    now = time.time()
+    for job_id, job in list(_jobs.items()):
+        if job['finished'] is not None and now - job['finished'] > _config['ttl']:
+            del _jobs[job_id]
+            _progress.pop(job_id, None)
+
+def job_ids():
+    """删除已过期的任务，返回其余任务的ID集合"""
+    with _lock:
+        if _executor is not None:
+            _prune()
+        return set(_jobs)
+
+def submit(kind, func_name, *args, **kwargs):
+    """提交一个在进程池中执行的steganography.<func_name>(*args, **kwargs)任务，返回任务ID
+
+    kind为任务种类（如'encode'、'decode'），原样保存在任务状态中；排队和运行中的任务数达到上限时抛出RuntimeError。
+    """
+    with _lock:
+        executor = _ensure_executor()
+        _prune()
+        pending = sum(1 for job in _jobs.values() if job['finished'] is None)
+        if pending >= _config['max_pending']:
+            raise RuntimeError("任务队列已满，请稍后再试")
+
+        job_id = uuid.uuid4().hex
+        job = {'kind': kind, 'created': time.time(), 'finished': None, 'future': None}
+        _jobs[job_id] = job
+        job['future'] = executor.submit(_run_job, job_id, _progress, func_name, args, kwargs)
+
+    def done(future):
+        job['finished'] = time.time()
+    job['future'].add_done_callback(done)
+    return job_id
+
+def status(job_id):
+    """返回任务状态，任务不存在（或已过期）时返回None
+
+    state依次为'queued'、'running'，结束后为'done'或'failed'；progress为最近一次报告的进度；
+    任务成功时result为任务函数的返回值，失败时error为错误信息。
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return None
+
+    future = job['future']
+    info = {
+        'id': job_id, 'kind': job['kind'], 'state': 'queued', 'progress': _progress.get(job_id),
+        'created': job['created'], 'finished': job['finished'], 'result': None, 'error': None
+    }
+    if future.done():
+        try:
+            info['result'] = future.result()
+            info['state'] = 'done'
+        except Exception as e:
+            info['state'] = 'failed'
+            info['error'] = str(e)
+    elif future.running():
+        info['state'] = 'running'
+    return info
@@ -0,0 +1,67 @@
+import bisect
+import threading
+
+# 耗时直方图的桶上限（秒）
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_lock = threading.Lock()
+# (指标名, 标签) -> 各桶的计数（不累计）、总耗时和次数
+_histograms = {}
+_descriptions = {}
+
+def describe(name, text):
+    """设置指标的说明文字，输出为# HELP行"""
+    _descriptions[name] = text
+
+def observe(name, seconds, **labels):
+    """记录一次耗时"""
+    key = (name, tuple(sorted(labels.items())))
+    index = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0}
+        if index < len(BUCKETS):
+            histogram['buckets'][index] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+
+def _format_labels(labels):
+    """按Prometheus文本格式输出标签"""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+def render(extra=()):
+    """以Prometheus文本格式输出所有直方图
+
+    extra为额外输出的(指标名, 类型, 说明, 标签字典, 值)，用于计数器和仪表盘类指标。
+    """
+    with _lock:
+        snapshot = {key: dict(value, buckets=list(value['buckets'])) for key, value in _histograms.items()}
+
+    lines = []
+    for metric in sorted({name for name, _ in snapshot}):
+        if metric in _descriptions:
+            lines.append(f"# HELP {metric} {_descriptions[metric]}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), histogram in sorted(snapshot.items()):
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+
+    described = set()
+    for name, metric_type, text, labels, value in extra:
+        if name not in described:
+            described.add(name)
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+    return '\n'.join(lines) + '\n'
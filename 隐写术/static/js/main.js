@@ -85,6 +85,16 @@ document.addEventListener('DOMContentLoaded', function() {
             formData.append('secret_file', secretFile);
         }
         
+        const password = document.getElementById('encode-password').value;
+        if (password) {
+            formData.append('password', password);
+        }
+        
+        const passphrase = document.getElementById('encode-passphrase').value;
+        if (passphrase) {
+            formData.append('passphrase', passphrase);
+        }
+        
         fetch('/encode', {
             method: 'POST',
             body: formData
@@ -128,6 +138,16 @@ document.addEventListener('DOMContentLoaded', function() {
         const formData = new FormData();
         formData.append('carrier_file', carrierFile);
         
+        const password = document.getElementById('decode-password').value;
+        if (password) {
+            formData.append('password', password);
+        }
+        
+        const passphrase = document.getElementById('decode-passphrase').value;
+        if (passphrase) {
+            formData.append('passphrase', passphrase);
+        }
+        
         fetch('/decode', {
             method: 'POST',
             body: formData
@@ -152,6 +172,13 @@ document.addEventListener('DOMContentLoaded', function() {
                 document.getElementById('result-text').textContent = data.data;
                 document.getElementById('text-result').style.display = 'block';
                 document.getElementById('file-result').style.display = 'none';
+            } else if (data.type === 'records') {
+                // 逐条显示追加的记录，文件记录只显示文件名
+                document.getElementById('result-text').textContent = data.records.map((record, index) =>
+                    `[${index + 1}] ` + (record.type === 'file' ? `文件: ${record.filename}` : record.data)
+                ).join('\n\n');
+                document.getElementById('text-result').style.display = 'block';
+                document.getElementById('file-result').style.display = 'none';
             } else if (data.type === 'file' || data.blob) {
                 // 显示文件下载链接
                 const blob = data.blob;
@@ -0,0 +1,42 @@
+"""图片/音频/视频隐写工具
+
+导入本包时只加载核心格式实现（numpy和标准库），Pillow和OpenCV由对应的载体后端在第一次用到时才导入，
+批量处理和命令行模块也按需加载。命令行用法: python -m steganography
+"""
+import importlib
+from .api import (
+    append_file, append_text, detect_carrier_type, extract, hide_file, hide_text, probe, register_backend, update_file,
+    update_text
+)
+from .cache import cache_stats, carrier_digest, clear_cache, configure_cache
+from .core import add_timing_hook, remove_timing_hook, set_progress_callback
+
+# 按需加载的公开函数及其所在的子模块
+_LAZY = {
+    'hide_text_in_image': 'image', 'extract_from_image': 'image', 'configure_png': 'image',
+    'hide_text_in_audio': 'audio', 'extract_from_audio': 'audio',
+    'hide_text_in_video': 'video', 'extract_from_video': 'video',
+    'analyze': 'analysis',
+    'find_carriers': 'batch', 'batch_extract': 'batch', 'batch_hide': 'batch', 'batch_analyze': 'batch',
+    'hide_sharded': 'batch', 'extract_set': 'batch',
+    'main': '__main__'
+}
+
+__all__ = [
+    'hide_text', 'hide_file', 'extract', 'probe', 'detect_carrier_type', 'register_backend',
+    'update_text', 'update_file', 'append_text', 'append_file',
+    'set_progress_callback', 'add_timing_hook', 'remove_timing_hook',
+    'configure_cache', 'cache_stats', 'clear_cache', 'carrier_digest'
+] + list(_LAZY)
+
+def __getattr__(name):
+    """第一次访问时导入子模块并返回其中的函数"""
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,164 @@
+"""命令行入口：python -m steganography"""
+import argparse
+import collections
+import json
+import logging
+import os
+import sys
+from .analysis import _SCORE_THRESHOLD
+from .api import detect_carrier_type
+from .batch import _output_key, batch_analyze, batch_extract, batch_hide, find_carriers
+from .core import _CODECS, _ECC_CODES
+
+def _carrier_names(paths):
+    """展开文件和目录列表，返回{载体路径: 输出用的相对路径}
+
+    目录中的载体保持相对于该目录的路径，单独列出的文件使用文件名。来自不同参数的载体相对路径相同时
+    （只有扩展名不同也算），这些载体的路径前加上所在参数的序号作为子目录，例如batch a b中的0/x.png和1/x.png。
+    """
+    sources = {}
+    for index, path in enumerate(paths):
+        for carrier_path in find_carriers([path]):
+            name = os.path.relpath(carrier_path, path) if os.path.isdir(path) else os.path.basename(carrier_path)
+            sources.setdefault(carrier_path, (index, name))
+    indexes = collections.defaultdict(set)
+    for index, name in sources.values():
+        indexes[_output_key(name)].add(index)
+    return {carrier_path: os.path.join(str(index), name) if len(indexes[_output_key(name)]) > 1 else name
+            for carrier_path, (index, name) in sources.items()}
+
+def _is_image(carrier_path):
+    """判断载体是否为图片，无法识别的载体返回False，由工作进程报告为该载体的错误"""
+    try:
+        return detect_carrier_type(carrier_path) == '图片'
+    except ValueError:
+        return False
+
+def _print_extracted(item, output_dir, name):
+    """输出一条批量提取结果，文件类型的结果以name（载体的相对路径）加文件名为名保存到output_dir"""
+    if item['error']:
+        print(f"{item['path']}\t错误\t{item['error']}", file=sys.stderr)
+        return
+    result = item['result']
+    if isinstance(result, dict) and result['type'] == 'records':
+        # 追加过记录的载体逐条输出，路径后加上记录序号
+        for index, record in enumerate(result['records']):
+            _print_extracted({'path': f"{item['path']}#{index}", 'result': record, 'error': None}, output_dir,
+                             f"{name}#{index}")
+        return
+    if isinstance(result, dict) and result['type'] == 'file':
+        if output_dir:
+            # 以载体的相对路径作为前缀，避免不同载体中的同名文件互相覆盖
+            saved_path = os.path.join(output_dir, f"{name}_{os.path.basename(result['filename'])}")
+            os.makedirs(os.path.dirname(saved_path), exist_ok=True)
+            with open(saved_path, 'wb') as f:
+                f.write(result['data'])
+            print(f"{item['path']}\t文件\t{saved_path}")
+        else:
+            print(f"{item['path']}\t文件\t{result['filename']}（{len(result['data'])}字节）")
+    else:
+        text = result['data'] if isinstance(result, dict) else result
+        print(f"{item['path']}\t文本\t{json.dumps(text, ensure_ascii=False)}")
+
+def _run_analyze(args):
+    """执行analyze子命令，每行输出路径、判断结果、可疑程度和各项检验的结果，有载体分析失败时返回1"""
+    failed = 0
+    for item in batch_analyze(args.paths, args.workers, args.threshold):
+        if item['error']:
+            failed += 1
+            print(f"{item['path']}\t错误\t{item['error']}", file=sys.stderr)
+            continue
+        result = item['result']
+        if args.suspicious_only and not result['suspicious']:
+            continue
+        print(f"{item['path']}\t{'可疑' if result['suspicious'] else '正常'}\t{result['score']:.3f}\t"
+              f"卡方={result['chi_square']:.3f}\tSPA={_format_rate(result['sample_pair'])}\t"
+              f"RS={_format_rate(result['rs'])}\t前缀={_format_rate(result['prefix_rate'])}")
+    return 1 if failed else 0
+
+def _format_rate(rate):
+    """格式化嵌入率估计，无法估计时输出-"""
+    return '-' if rate is None else f"{rate:.3f}"
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(prog='steganography', description='图片/音频/视频隐写工具')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='输出诊断信息，-vv输出调试信息')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    batch = subparsers.add_parser('batch', help='批量提取或隐写目录中的载体文件')
+    batch.add_argument('paths', nargs='+', help='载体文件或目录')
+    batch.add_argument('-w', '--workers', type=int, help='并行进程数，默认使用CPU核数')
+    batch.add_argument('-o', '--output-dir', help='输出目录：提取时保存提取出的文件，隐写时保存生成的载体')
+    secret = batch.add_mutually_exclusive_group()
+    secret.add_argument('--hide-text', help='将该文本隐藏到每个载体中')
+    secret.add_argument('--hide-file', help='将该文件隐藏到每个载体中')
+    batch.add_argument('--compression', choices=['auto'] + list(_CODECS), help='隐写时使用的压缩方式')
+    batch.add_argument('--bits', type=int, default=1, help='隐写时每个通道/采样使用的最低位数（1-4）')
+    batch.add_argument('--password', help='按密码打乱嵌入位置，提取时需要提供相同的密码')
+    batch.add_argument('--passphrase', help='隐写时用该口令加密载荷，提取时需要提供相同的口令')
+    batch.add_argument('--ecc', choices=list(_ECC_CODES), help='隐写时使用的纠错编码，提取时自动识别')
+    batch.add_argument('--adaptive', action='store_true',
+                       help='图片按纹理自适应嵌入，--bits为纹理最强处使用的位数，其他载体不受影响')
+    
+    analyze = subparsers.add_parser('analyze', help='对目录中的图片和音频进行隐写分析，检测最低有效位中是否隐藏了数据')
+    analyze.add_argument('paths', nargs='+', help='载体文件或目录')
+    analyze.add_argument('-w', '--workers', type=int, help='并行进程数，默认使用CPU核数')
+    analyze.add_argument('--threshold', type=float, default=_SCORE_THRESHOLD, help='可疑程度不低于该值时视为可疑')
+    analyze.add_argument('--suspicious-only', action='store_true', help='只输出可疑的载体')
+    
+    args = parser.parse_args(argv)
+    levels = [logging.WARNING, logging.INFO, logging.DEBUG]
+    logging.basicConfig(level=levels[min(args.verbose, 2)], format='%(levelname)s %(message)s', stream=sys.stderr)
+    if args.command == 'analyze':
+        return _run_analyze(args)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    
+    # 输出目录中保持载体相对于所在目录的路径，不同子目录中的同名载体不会互相覆盖
+    names = _carrier_names(args.paths)
+    failed = 0
+    if args.hide_text is None and args.hide_file is None:
+        for item in batch_extract(list(names), args.workers, args.password, args.passphrase):
+            failed += item['error'] is not None
+            _print_extracted(item, args.output_dir, names[item['path']])
+    else:
+        if not args.output_dir:
+            parser.error("隐写时必须通过--output-dir指定输出目录")
+        jobs = []
+        for carrier_path, name in names.items():
+            job = {
+                'carrier_path': carrier_path,
+                'output_path': os.path.join(args.output_dir, name),
+                'compression': args.compression,
+                'bits': args.bits,
+                'password': args.password,
+                'passphrase': args.passphrase,
+                'ecc': args.ecc,
+                'adaptive': args.adaptive and _is_image(carrier_path)
+            }
+            if args.hide_file:
+                job['secret_path'] = args.hide_file
+            else:
+                job['secret_text'] = args.hide_text
+            jobs.append(job)
+        # 同一目录中只有扩展名不同的载体（图片可能改存为PNG）输出会互相覆盖，只隐写第一个，其余报告为错误
+        outputs = {}
+        for job in jobs:
+            other = outputs.setdefault(_output_key(job['output_path']), job['carrier_path'])
+            if other != job['carrier_path']:
+                failed += 1
+                print(f"{job['carrier_path']}\t错误\t输出路径与{other}相同", file=sys.stderr)
+        jobs = [job for job in jobs if outputs[_output_key(job['output_path'])] == job['carrier_path']]
+        for job in jobs:
+            os.makedirs(os.path.dirname(job['output_path']), exist_ok=True)
+        for item in batch_hide(jobs, args.workers):
+            if item['error']:
+                failed += 1
+                print(f"{item['path']}\t错误\t{item['error']}", file=sys.stderr)
+            else:
+                print(f"{item['path']}\t完成\t{item['result']}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
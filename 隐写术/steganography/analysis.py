@@ -0,0 +1,170 @@
+"""隐写分析：用卡方检验、样本对分析（SPA）和RS分析检测载体的最低有效位中是否隐藏了数据
+
+分析不依赖本工具的容器格式，也能发现其他工具按顺序或随机位置嵌入的数据。载体的采样值由各后端的samples函数逐块读出，
+统计量逐块累积，内存占用只与块大小有关。
+"""
+import logging
+import math
+import numpy as np
+from .api import _backend, detect_carrier_type
+
+logger = logging.getLogger(__name__)
+
+# 每块的采样数，每块结束时对已读取的前缀检验一次
+_TILE_SAMPLES = 1 << 16
+# 卡方检验中期望频数低于该值的值对不参与计算
+_CHI_MIN_EXPECTED = 5
+# 卡方p值不低于该值时才计入score，自然图片的p值也常在0.1到0.8之间波动
+_CHI_CONFIDENCE = 0.99
+# 高位相同的相邻采样对少于该比例时不估计嵌入率，16位音频和接近均匀噪声的图片都低于该比例
+_MIN_CLOSE_PAIRS = 0.05
+# 前缀上的嵌入率估计减去该值后才计入score，前缀的采样较少，受画面内容（例如图片顶部的天空）影响更大
+_PREFIX_MARGIN = 0.1
+# 默认的可疑阈值，score不低于该值时视为可疑
+_SCORE_THRESHOLD = 0.15
+# 各种采样类型计算时使用的整数类型，要能容纳F-1翻转后超出原值域1的值
+_WORK_DTYPES = {np.dtype(np.uint8): np.int16, np.dtype(np.int16): np.int32}
+
+def analyze(carrier_path, threshold=_SCORE_THRESHOLD, tile_samples=_TILE_SAMPLES):
+    """对载体进行隐写分析，返回各项检验的结果和综合的可疑程度
+
+    返回字典：samples为参与分析的采样数；chi_square为卡方检验在各前缀上得到的最大p值，只用于8位采样，其他采样为0；
+    sample_pair和rs为样本对分析和RS分析对整个载体估计的嵌入率（0-1，即携带隐藏数据的采样所占的比例），
+    模型不成立（二次方程无实根）时为None；prefix_rate为每块结束时对已读取前缀估计的嵌入率中的最大值，
+    按顺序嵌入的短消息只占载体开头的一小部分，整体嵌入率很低，但在数据所在的前缀上明显偏高。
+    score取整体嵌入率、prefix_rate减去_PREFIX_MARGIN以及不低于_CHI_CONFIDENCE的卡方p值中的最大者，
+    不低于threshold时suspicious为True。嵌入率取两种估计中可用者的平均值；相邻采样几乎从不只在最低位上不同时
+    （例如16位和24位音频），最低位本身就是噪声，无法判断是否隐藏了数据，sample_pair、rs和prefix_rate均为None，score为0。
+    图片按行、音频按时间顺序逐块读取，未压缩的BMP和WAV通过内存映射读取，其他图片格式需要先解码整张图片。
+    """
+    carrier_type = detect_carrier_type(carrier_path)
+    sample_tiles = _backend(carrier_type).get('samples')
+    if sample_tiles is None:
+        raise ValueError(f"不支持对{carrier_type}载体进行隐写分析")
+
+    histogram = None
+    chi_square = 0.0
+    samples = 0
+    pair_counts = np.zeros(4, dtype=np.int64)
+    rs_counts = np.zeros(8, dtype=np.int64)
+    prefix_rate = sample_pair = rs = None
+    for tile in sample_tiles(carrier_path, tile_samples):
+        if tile.size == 0:
+            continue
+        samples += tile.size
+        # 卡方检验只适用于8位采样，16位采样的直方图过于稀疏，相邻值对的频数本来就差异很大
+        if tile.dtype == np.uint8:
+            counts = np.bincount(tile.ravel(), minlength=256)
+            histogram = counts if histogram is None else histogram + counts
+            chi_square = max(chi_square, _chi_square_p(histogram))
+        tile = tile.astype(_WORK_DTYPES.get(tile.dtype, np.int64))
+        pair_counts += _sample_pair_counts(tile)
+        rs_counts += _rs_counts(tile)
+        x, y, k, pairs = pair_counts.tolist()
+        if k < _MIN_CLOSE_PAIRS * pairs:
+            continue
+        sample_pair = _sample_pair_rate(x, y, k, pairs)
+        rs = _rs_rate(*rs_counts.tolist())
+        rate = _combined_rate(sample_pair, rs)
+        if rate is not None and (prefix_rate is None or rate > prefix_rate):
+            prefix_rate = rate
+
+    x, y, k, pairs = pair_counts.tolist()
+    if k < _MIN_CLOSE_PAIRS * pairs:
+        # 相邻采样几乎从不只在最低位上不同（例如16位和24位音频），最低位本身就是噪声，两种方法都无法估计嵌入率
+        logger.debug("%s的相邻采样差异过大，跳过嵌入率估计", carrier_path)
+        sample_pair = rs = prefix_rate = None
+    rate = _combined_rate(sample_pair, rs)
+    score = max(rate or 0.0, prefix_rate - _PREFIX_MARGIN if prefix_rate is not None else 0.0,
+                chi_square if chi_square >= _CHI_CONFIDENCE else 0.0)
+    logger.debug("隐写分析 %s: 卡方p=%.4f SPA=%s RS=%s 前缀=%s", carrier_path, chi_square, sample_pair, rs, prefix_rate)
+    return {
+        'path': carrier_path, 'carrier_type': carrier_type, 'samples': samples, 'chi_square': chi_square,
+        'sample_pair': sample_pair, 'rs': rs, 'prefix_rate': prefix_rate, 'score': score, 'suspicious': score >= threshold
+    }
+
+def _combined_rate(sample_pair, rs):
+    """返回两种嵌入率估计中可用者的平均值，都不可用时返回None"""
+    rates = [rate for rate in (sample_pair, rs) if rate is not None]
+    return sum(rates) / len(rates) if rates else None
+
+def _chi_square_p(histogram):
+    """对直方图中的值对(2k, 2k+1)做卡方检验，返回两者频数相等的p值，最低位被随机数据替换后接近1"""
+    even = histogram[0::2].astype(np.float64)
+    odd = histogram[1::2].astype(np.float64)
+    total = even + odd
+    used = total >= 2 * _CHI_MIN_EXPECTED
+    dof = int(used.sum()) - 1
+    if dof < 1:
+        return 0.0
+    chi2 = float(((even[used] - odd[used]) ** 2 / total[used]).sum())
+    # 用Wilson-Hilferty近似计算卡方分布的上侧概率，不依赖scipy
+    z = ((chi2 / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def _sample_pair_counts(tile):
+    """统计每行中相邻采样对的X、Y、K和总数，K为高位相同（只有最低位可能不同）的采样对数"""
+    u = tile[:, :-1]
+    v = tile[:, 1:]
+    even = (v & 1) == 0
+    x = np.count_nonzero(np.where(even, u < v, u > v))
+    y = np.count_nonzero(np.where(even, u > v, u < v))
+    k = np.count_nonzero((u >> 1) == (v >> 1))
+    return np.array([x, y, k, u.size], dtype=np.int64)
+
+def _sample_pair_rate(x, y, k, total):
+    """解样本对分析的二次方程 K/2·p² + (2X - P)·p + (Y - X) = 0，返回较小的根作为嵌入率的估计，无实根时返回None"""
+    if total == 0 or k == 0:
+        return None
+    a, b, c = k / 2, 2 * x - total, y - x
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        # 载体不符合样本对分析的模型，不能据此判断是否隐藏了数据
+        return None
+    root = math.sqrt(discriminant)
+    rate = min((-b + root) / (2 * a), (-b - root) / (2 * a))
+    return min(max(rate, 0.0), 1.0)
+
+def _smoothness(c0, c1, c2, c3):
+    """RS分析的判别函数：组内相邻采样之差的绝对值之和"""
+    return np.abs(c1 - c0) + np.abs(c2 - c1) + np.abs(c3 - c2)
+
+def _rs_counts(tile):
+    """将每行按4个采样分组，统计原始采样和最低位全部翻转后的R_M、S_M、R_-M、S_-M"""
+    width = tile.shape[1] // 4 * 4
+    if width == 0:
+        return np.zeros(8, dtype=np.int64)
+    # 按组内位置拆成4个连续的数组，比沿长度为4的轴做差分快得多
+    columns = np.ascontiguousarray(tile[:, :width].reshape(-1, 4).T)
+    counts = []
+    for c0, c1, c2, c3 in (columns, columns ^ 1):
+        f = _smoothness(c0, c1, c2, c3)
+        # 掩码[0, 1, 1, 0]只作用于中间两个采样：F1交换2k和2k+1，F-1交换2k-1和2k
+        positive = _smoothness(c0, c1 ^ 1, c2 ^ 1, c3)
+        negative = _smoothness(c0, ((c1 + 1) ^ 1) - 1, ((c2 + 1) ^ 1) - 1, c3)
+        counts += [np.count_nonzero(positive > f), np.count_nonzero(positive < f),
+                   np.count_nonzero(negative > f), np.count_nonzero(negative < f)]
+    return np.array(counts, dtype=np.int64)
+
+def _rs_rate(r_m, s_m, r_neg, s_neg, r_m_flipped, s_m_flipped, r_neg_flipped, s_neg_flipped):
+    """由原始和翻转后的R/S统计量估计嵌入率，模型不成立时返回None"""
+    d0 = r_m - s_m
+    d1 = r_m_flipped - s_m_flipped
+    d_neg0 = r_neg - s_neg
+    d_neg1 = r_neg_flipped - s_neg_flipped
+    a = 2 * (d1 + d0)
+    b = d_neg0 - d_neg1 - d1 - 3 * d0
+    c = d0 - d_neg0
+    if a == 0:
+        if b == 0:
+            return None
+        x = -c / b
+    else:
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return None
+        root = math.sqrt(discriminant)
+        x = min((-b + root) / (2 * a), (-b - root) / (2 * a), key=abs)
+    if x == 0.5:
+        return None
+    return min(max(x / (x - 0.5), 0.0), 1.0)
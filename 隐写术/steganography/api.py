@@ -0,0 +1,319 @@
+import importlib
+import logging
+import os
+import sys
+from .core import (
+    _ADAPTIVE_FLAG, _CODECS, _CODEC_MASK, _CONTAINER_HEADER, _CONTAINER_VERSION, _ECC_CODES, _ECC_MASK, _ECC_SHIFT,
+    _ENCRYPTED_FLAG, _PAYLOAD_TYPES, _PROBE_SLOTS, _compress_payload, _container_records, _ecc_payload, _encrypt_if,
+    _file_payload, _head_slots, _pack_container, _passphrase_keys, _payload_layout, _read_head, _records_payload,
+    _span, _text_payload, _unpack_payload
+)
+from .cache import _cache_get, _cache_key, _cache_put, carrier_digest
+
+logger = logging.getLogger(__name__)
+
+def hide_text(carrier_path, output_path, secret_text, carrier_type=None, compression=None, bits=1, password=None,
+              passphrase=None, ecc=None, adaptive=False):
+    """将文本隐藏到载体文件中
+
+    carrier_type为'图片'、'音频'、'视频'（或别名'image'、'audio'、'video'）等已注册的载体类型，为None时按文件头自动识别。
+    图片载体也可以是文件对象或字节串，output_path可以是文件对象（写入PNG）或None（返回PNG文件的字节串），不经过磁盘。
+    compression为None时不压缩，为'auto'时自动选择压缩效果最好的编码，也可以指定'zlib'、'lzma'或'bz2'。
+    bits为每个图片通道/音频采样使用的最低位数（1-4），提取时会从容器头中自动识别。
+    password不为None时按密码伪随机地选择嵌入位置，提取时必须提供相同的密码。
+    passphrase不为None时用该口令对载荷进行分块认证加密（scrypt派生密钥、AES-GCM，需要安装cryptography库），
+    提取时必须提供相同的口令。
+    ecc为None时不使用纠错编码，为'hamming'时使用汉明(7,4)码（每4位纠正1位错误，数据膨胀为1.75倍），
+    为'repeat'时使用三重重复码（每3位纠正1位错误，数据膨胀为3倍）；使用纠错编码时长度前缀和容器头也按三重重复码写入。
+    adaptive为True时（只支持图片）按纹理自适应嵌入：数据优先写入纹理强的区域，纹理越强每个通道使用的最低位越多，
+    bits为最多使用的位数，平坦区域最后才使用；提取时由隐写后的图片重新算出相同的位置，需要解码整张图片。
+    """
+    payload = _compress_payload(_text_payload(secret_text), compression)
+    payload = _ecc_payload(_encrypt_if(payload, passphrase), ecc)
+    return _hide_payload(carrier_path, output_path, payload, carrier_type, bits, password, adaptive)
+
+def hide_file(carrier_path, output_path, secret_path, carrier_type=None, compression=None, bits=1, password=None,
+              passphrase=None, ecc=None, adaptive=False):
+    """将文件隐藏到载体文件中，compression、bits、password、passphrase、ecc和adaptive的含义与hide_text相同"""
+    # 文件名和原始内容直接封装进二进制容器，文件内容分块读取，不会整体读入内存
+    payload = _compress_payload(_file_payload(secret_path), compression)
+    payload = _ecc_payload(_encrypt_if(payload, passphrase), ecc)
+    return _hide_payload(carrier_path, output_path, payload, carrier_type, bits, password, adaptive)
+
+def _hide_payload(carrier_path, output_path, payload, carrier_type=None, bits=1, password=None, adaptive=False):
+    """根据载体类型将载荷隐藏到载体文件中，carrier_type为None时按文件头识别，返回实际保存的位置"""
+    backend = _backend_for(carrier_path, carrier_type)
+    if adaptive:
+        if not backend.get('adaptive'):
+            raise ValueError("该载体类型不支持按纹理自适应嵌入")
+        payload = dict(payload, adaptive=True)
+    return backend['embed'](carrier_path, output_path, payload, bits, password)
+
+def update_text(carrier_path, secret_text, output_path=None, carrier_type=None, compression=None, password=None,
+                passphrase=None):
+    """用新的文本替换载体中已隐藏的数据，只改写发生变化的位置，返回修改后的文件路径
+
+    载体必须是已经隐写过的文件，新数据沿用原来的位数、纠错编码和自适应嵌入方式，password须与隐写时相同；
+    compression和passphrase的含义与hide_text相同，加密时每次都使用新的盐值，因此会改写全部数据。
+    output_path为None时直接修改载体文件，否则先复制到output_path再修改。WAV和未压缩的BMP、PGM/PPM、TIFF
+    通过内存映射只改写变化的区域和容器头，耗时与改动的大小成正比；PNG等格式需要解码并重新编码整张图片。
+    """
+    payload = _encrypt_if(_compress_payload(_text_payload(secret_text), compression), passphrase)
+    return _update_payload(carrier_path, output_path, lambda data: payload, carrier_type, password)
+
+def update_file(carrier_path, secret_path, output_path=None, carrier_type=None, compression=None, password=None,
+                passphrase=None):
+    """用新的文件替换载体中已隐藏的数据，参数的含义与update_text相同"""
+    payload = _encrypt_if(_compress_payload(_file_payload(secret_path), compression), passphrase)
+    return _update_payload(carrier_path, output_path, lambda data: payload, carrier_type, password)
+
+def append_text(carrier_path, secret_text, output_path=None, carrier_type=None, compression=None, password=None,
+                passphrase=None):
+    """在载体已隐藏的数据之后追加一条文本记录，返回修改后的文件路径
+
+    追加后extract返回{'type': 'records', 'records': [各条记录的提取结果]}。原有的单条数据在第一次追加时
+    转换为第一条记录，之后每次追加只写入新记录和容器头。每条记录单独压缩和加密，compression和passphrase只作用于新记录，
+    提取时各条加密记录须使用同一个口令。其余参数的含义与update_text相同。
+    """
+    record = _pack_container(_encrypt_if(_compress_payload(_text_payload(secret_text), compression), passphrase))
+    return _update_payload(carrier_path, output_path, lambda data: _records_payload(_container_records(data) + [record]),
+                           carrier_type, password)
+
+def append_file(carrier_path, secret_path, output_path=None, carrier_type=None, compression=None, password=None,
+                passphrase=None):
+    """在载体已隐藏的数据之后追加一个文件记录，参数的含义与append_text相同"""
+    record = _pack_container(_encrypt_if(_compress_payload(_file_payload(secret_path), compression), passphrase))
+    return _update_payload(carrier_path, output_path, lambda data: _records_payload(_container_records(data) + [record]),
+                           carrier_type, password)
+
+def _update_payload(carrier_path, output_path, build, carrier_type=None, password=None):
+    """根据载体类型改写载体中已有的容器，build由原有容器的数据生成新的载荷，见core._update_container"""
+    if not _is_path(carrier_path):
+        raise ValueError("只能更新文件路径指定的载体")
+    backend = _backend_for(carrier_path, carrier_type)
+    if not callable(backend.get('update')):
+        raise ValueError("该载体类型不支持原地更新")
+    return backend['update'](carrier_path, output_path, build, password)
+
+def extract(carrier_path, use_cache=True, password=None, passphrase=None, digest=None):
+    """从载体文件中提取隐藏信息，图片载体也可以是文件对象、字节串、NumPy数组或PIL图片
+
+    use_cache为True时按载体内容的哈希（以及格式、密码和口令）缓存提取到的原始数据，同一载体再次提取时不需要重新解码，
+    文件名不影响结果，见configure_cache；NumPy数组和PIL图片不使用缓存。调用方已经用carrier_digest计算过载体的哈希时
+    可以通过digest传入，不再读取整个载体。
+    隐写时使用了密码的载体必须提供相同的password；载荷已加密时还必须提供相同的passphrase，
+    口令缺失或错误时抛出ValueError，此时只读取第一个加密块。缓存中只保存解密前的数据。
+    验证口令时派生的密钥在解密时复用，每次提取只运行一次scrypt。
+    """
+    keys = _passphrase_keys(passphrase)
+    if not use_cache or _is_pixels(carrier_path):
+        raw = _extract_raw(carrier_path, password, keys)
+    else:
+        key = _cache_key(digest or carrier_digest(carrier_path), _detect(carrier_path), password, passphrase)
+        raw = _cache_get(key)
+        if raw is None:
+            raw = _extract_raw(carrier_path, password, keys)
+            _cache_put(key, raw)
+    with _span('unpack'):
+        return _unpack_payload(raw, keys)
+
+# 载体后端注册表：载体类型 -> {'module': 后端模块名, 'functions': 后端函数字典，导入模块前为None}
+# 后端模块第一次用到时才导入，只处理WAV时不需要加载Pillow和OpenCV
+_BACKENDS = {}
+# 载体类型的别名，例如'image'对应'图片'
+_ALIASES = {}
+# 按扩展名识别的载体类型
+_CARRIER_TYPES = {}
+# 按文件头识别的载体类型：(偏移, 长度) -> {魔数: 载体类型}，每种偏移和长度只需查一次字典
+_SIGNATURES = {}
+# 识别格式时读取的文件头字节数，随注册的魔数增长
+_sniff_size = 0
+# 后端需要提供的函数
+_BACKEND_FUNCTIONS = ('capacity', 'embed', 'extract', 'probe', 'scatter')
+
+def register_backend(carrier_type, backend, extensions=(), signatures=(), aliases=()):
+    """注册载体后端，已注册的同名载体类型、别名、扩展名和魔数会被覆盖
+
+    backend为后端函数字典，或者后端模块名（以.开头时相对于本包），模块在第一次用到时才导入，取其中的BACKEND字典。
+    字典中的函数为：capacity(path)返回载体可用于隐写的通道/采样数；
+    embed(path, output_path, payload, bits, password)隐写载荷并返回实际保存的文件路径；
+    extract(path, scatter, passphrase)返回提取到的原始数据；probe(path, n_slots)返回(至少包含前n_slots个位置的slots, 总数)；
+    scatter(path, password)返回提取时使用的打乱密钥。可选的samples(path, tile_samples)按块产出用于隐写分析的采样值，
+    每块为二维整数数组，每行是一段相邻的采样，见analysis.analyze。字典中的buffers为True时，
+    这些函数除了文件路径也接受文件对象和字节串，embed的output_path也可以是文件对象或None。
+    adaptive为True时embed支持载荷的adaptive字段（按纹理自适应嵌入，见core._embed_payload），probe返回的slots为(高, 宽, 通道数)。
+    可选的update(path, output_path, build, password)改写载体中已有的容器并返回修改的文件路径，output_path为None时
+    直接修改载体文件，见core._update_container，提供了update的载体类型才支持update_text、append_text等函数。
+    extensions为扩展名列表，signatures为(偏移, 魔数)列表。识别载体时先按文件头的魔数，再按扩展名。
+    """
+    global _sniff_size
+    if not isinstance(backend, str):
+        _check_backend(backend)
+    _BACKENDS[carrier_type] = {'module': backend if isinstance(backend, str) else None,
+                               'functions': None if isinstance(backend, str) else dict(backend)}
+    for alias in aliases:
+        _ALIASES[alias] = carrier_type
+    for ext in extensions:
+        _CARRIER_TYPES[ext.lower()] = carrier_type
+    for offset, magic in signatures:
+        _SIGNATURES.setdefault((offset, len(magic)), {})[bytes(magic)] = carrier_type
+        _sniff_size = max(_sniff_size, offset + len(magic))
+
+def _check_backend(functions):
+    """检查后端是否提供了所有需要的函数"""
+    missing = [name for name in _BACKEND_FUNCTIONS if not callable(functions.get(name))]
+    if missing:
+        raise ValueError(f"载体后端缺少函数: {', '.join(missing)}")
+
+def _backend(carrier_type):
+    """返回载体类型对应的后端函数字典，后端模块在第一次调用时导入"""
+    entry = _BACKENDS.get(_ALIASES.get(carrier_type, carrier_type))
+    if entry is None:
+        raise ValueError(f"不支持的载体类型: {carrier_type}")
+    if entry['functions'] is None:
+        module = entry['module']
+        backend = importlib.import_module(module, __package__ if module.startswith('.') else None).BACKEND
+        _check_backend(backend)
+        entry['functions'] = backend
+    return entry['functions']
+
+def _is_path(carrier):
+    """判断载体是否为文件路径，否则为文件对象或字节串等内存中的数据"""
+    return isinstance(carrier, (str, os.PathLike))
+
+def _is_pixels(carrier):
+    """判断载体是否为NumPy数组或PIL图片等已解码的像素数组"""
+    return hasattr(carrier, '__array_interface__')
+
+def _read_header(carrier, size):
+    """读取载体的前size个字节，文件对象读取后恢复原来的位置"""
+    if isinstance(carrier, (bytes, bytearray, memoryview)):
+        return bytes(carrier[:size])
+    if _is_path(carrier):
+        with open(carrier, 'rb') as f:
+            return f.read(size)
+    position = carrier.tell()
+    try:
+        return carrier.read(size)
+    finally:
+        carrier.seek(position)
+
+def _sniff(path):
+    """读取文件头，按魔数识别载体类型，无法识别时返回None"""
+    try:
+        header = _read_header(path, _sniff_size)
+    except (OSError, AttributeError):
+        return None
+    for (offset, length), table in _SIGNATURES.items():
+        carrier_type = table.get(header[offset:offset + length])
+        if carrier_type is not None:
+            return carrier_type
+    return None
+
+def _detect(path):
+    """识别载体类型，先按文件头的魔数，再按扩展名，都无法识别时返回None"""
+    if _is_pixels(path):
+        return '图片'
+    if not _is_path(path):
+        return _sniff(path)
+    return _sniff(path) or _CARRIER_TYPES.get(os.path.splitext(path)[1].lower())
+
+def detect_carrier_type(path):
+    """识别载体类型：只读取文件头的前若干字节匹配魔数，无法识别时再按扩展名判断，仍无法识别时抛出ValueError
+
+    path也可以是文件对象或字节串，此时只按魔数识别，文件对象的读取位置保持不变；NumPy数组和PIL图片识别为图片。
+    """
+    carrier_type = _detect(path)
+    if carrier_type is None and not _is_path(path):
+        raise ValueError("无法识别载体的格式")
+    if carrier_type is None:
+        raise ValueError(f"不支持的文件类型: {os.path.splitext(path)[1] or os.path.basename(path)}")
+    return carrier_type
+
+def _backend_for(path, carrier_type=None):
+    """返回载体对应的后端函数字典，carrier_type为None时按文件头识别；文件对象和字节串只能交给支持内存数据的后端
+
+    指定了carrier_type而文件头（或扩展名）识别出的是另一种载体时抛出ValueError。
+    """
+    if carrier_type is None:
+        carrier_type = detect_carrier_type(path)
+    backend = _backend(carrier_type)
+    detected = _detect(path)
+    if detected is not None and detected != _ALIASES.get(carrier_type, carrier_type):
+        raise ValueError(f"载体类型为{carrier_type}，但文件内容是{detected}")
+    if not _is_path(path) and not backend.get('buffers'):
+        raise ValueError(f"{carrier_type}载体只能通过文件路径处理")
+    return backend
+
+def _carrier_slots(path):
+    """只读取文件头，计算载体可用于隐写的通道/采样数"""
+    return _backend_for(path)['capacity'](path)
+
+def _extract_raw(carrier_path, password=None, passphrase=None):
+    """根据载体类型从载体中提取隐藏的原始数据，加密的载荷在口令缺失或错误时只包含第一个加密块"""
+    # 检测文件类型
+    ext = os.path.splitext(carrier_path)[1].lower() if _is_path(carrier_path) else ''
+    if ext in ['.m4a', '.mp3', '.aac']:
+        # 对于不支持的音频格式，提示用户转换为WAV格式
+        logger.warning("当前版本仅支持WAV格式的音频文件，请将您的音频文件转换为WAV格式后再试（可以使用在线转换工具或音频编辑软件进行转换）")
+        return b""
+    
+    backend = _backend_for(carrier_path)
+    scatter = backend['scatter'](carrier_path, password) if password is not None else None
+    return backend['extract'](carrier_path, scatter, passphrase)
+
+# 内置的载体后端
+register_backend('图片', '.image', extensions=('.png', '.bmp', '.jpg', '.jpeg', '.pgm', '.ppm', '.pnm', '.tif', '.tiff'),
+                 signatures=((0, b'\x89PNG\r\n\x1a\n'), (0, b'BM'), (0, b'\xff\xd8\xff'), (0, b'P5'), (0, b'P6'),
+                             (0, b'II*\x00'), (0, b'MM\x00*'), (0, b'II+\x00'), (0, b'MM\x00+')),
+                 aliases=('image',))
+register_backend('音频', '.audio', extensions=('.wav',), signatures=((8, b'WAVE'),), aliases=('audio',))
+register_backend('视频', '.video', extensions=('.mp4', '.avi'),
+                 signatures=((8, b'AVI '), (4, b'ftypisom'), (4, b'ftypmp41'), (4, b'ftypmp42'), (4, b'ftypavc1')),
+                 aliases=('video',))
+
+def probe(carrier_path, password=None):
+    """只读取长度前缀和容器头，快速判断载体中是否隐藏了数据，而不提取载荷本身
+
+    返回字典：valid表示是否存在有效的数据头；format为'container'（当前格式）、'legacy'（旧版本格式）或None；
+    size为载荷的存储长度（字节，纠错编码前）；type、bits、compression、filename、encrypted、ecc和adaptive只对容器格式有效，
+    按纹理自适应嵌入时bits为最多使用的位数，加密的载荷不会给出文件名；carrier_type为按文件头识别的载体类型，capacity为载体的通道/采样总数。
+    隐写时使用了密码的载体需要提供相同的password才能识别。
+    """
+    info = {
+        'path': carrier_path, 'carrier_type': None, 'valid': False, 'format': None, 'type': None, 'size': 0,
+        'bits': None, 'compression': None, 'filename': None, 'encrypted': False, 'ecc': None, 'adaptive': False,
+        'capacity': 0
+    }
+    try:
+        info['carrier_type'] = detect_carrier_type(carrier_path)
+        backend = _backend_for(carrier_path, info['carrier_type'])
+        scatter = backend['scatter'](carrier_path, password) if password is not None else None
+        head, capacity = backend['probe'](carrier_path, _PROBE_SLOTS if scatter is None or scatter[1] else sys.maxsize)
+        info['capacity'] = capacity
+        if capacity < 32:
+            return info
+        layout = _payload_layout(head, capacity, scatter)
+        if layout is None:
+            return info
+        data_length, header_length, k, body_offset = layout
+        if header_length == 0:
+            info.update(valid=True, format='legacy', size=data_length, bits=1)
+            return info
+        
+        repeated = body_offset != _head_slots(header_length)
+        magic, version, type_id, flags, name_length, length, checksum = _CONTAINER_HEADER.unpack(
+            _read_head(head, 32, _CONTAINER_HEADER.size, repeated, scatter))
+        type_names = {value: name for name, value in _PAYLOAD_TYPES.items()}
+        codec_names = {value: name for name, value in _CODECS.items()}
+        ecc_names = {value: name for name, value in _ECC_CODES.items()}
+        info.update(valid=version <= _CONTAINER_VERSION, format='container', type=type_names.get(type_id),
+                    size=length, bits=k, compression=codec_names.get(flags & _CODEC_MASK),
+                    encrypted=bool(flags & _ENCRYPTED_FLAG), ecc=ecc_names.get((flags & _ECC_MASK) >> _ECC_SHIFT),
+                    adaptive=bool(flags & _ADAPTIVE_FLAG))
+        if head.size >= body_offset and not info['encrypted']:
+            info['filename'] = _read_head(head, 32 + _CONTAINER_HEADER.size * 8, name_length, repeated,
+                                          scatter).decode('utf-8', errors='replace')
+    except Exception as e:
+        logger.warning("探测载体失败: %s", e)
+    return info
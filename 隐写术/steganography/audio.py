@@ -0,0 +1,128 @@
+"""音频载体：直接解析WAV的RIFF块，通过内存映射读写采样，不依赖wave模块"""
+import logging
+import os
+import numpy as np
+from .core import (
+    _check_bits, _container_slots, _embed_mapped, _extract_lazily, _passphrase_keys, _payload_text, _scatter_key,
+    _text_payload, _update_mapped
+)
+
+logger = logging.getLogger(__name__)
+
+def _wav_layout(audio_path):
+    """解析WAV文件的RIFF块，返回(data块偏移, data块大小, 声道数, 采样字节数)"""
+    with open(audio_path, 'rb') as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            raise ValueError("当前版本仅支持WAV格式的音频文件，请将您的音频文件转换为WAV格式后再试")
+        channels = sampwidth = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError("WAV文件缺少data块")
+            chunk_id = chunk_header[:4]
+            chunk_size = int.from_bytes(chunk_header[4:8], 'little')
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                audio_format = int.from_bytes(fmt[0:2], 'little')
+                if audio_format not in (1, 0xFFFE):  # PCM / WAVE_FORMAT_EXTENSIBLE
+                    raise ValueError(f"不支持的WAV编码格式: {audio_format}")
+                channels = int.from_bytes(fmt[2:4], 'little')
+                sampwidth = int.from_bytes(fmt[12:14], 'little') // channels
+                if chunk_size % 2:
+                    f.seek(1, 1)
+            elif chunk_id == b'data':
+                if channels is None:
+                    raise ValueError("WAV文件缺少fmt块")
+                # 部分写入器会在流式写入时将data块大小记为0或超出文件长度
+                size = min(chunk_size, os.path.getsize(audio_path) - f.tell())
+                return f.tell(), size - size % (channels * sampwidth), channels, sampwidth
+            else:
+                f.seek(chunk_size + chunk_size % 2, 1)
+
+def _audio_slots(mm, sampwidth):
+    """返回每个采样最低有效字节的视图（WAV采样为小端序，支持8/16/24/32位）"""
+    return mm[::sampwidth]
+
+def _hide_payload(audio_path, output_path, payload, bits_per_sample=1, password=None):
+    """将载荷隐藏到音频中，每个采样使用最低bits_per_sample位"""
+    _check_bits(bits_per_sample)
+    
+    # 按文件内容检查格式，不是WAV时_wav_layout会给出提示
+    offset, size, channels, sampwidth = _wav_layout(audio_path)
+    
+    # 检查音频容量是否足够
+    if _container_slots(payload, bits_per_sample) > size // sampwidth:
+        raise ValueError("音频容量不足以隐藏所有数据")
+    
+    # 复制载体后通过内存映射只修改data块中前N个采样的最低有效位
+    _embed_mapped(audio_path, output_path, offset, (size,), lambda mm: _audio_slots(mm, sampwidth),
+                  payload, bits_per_sample, _scatter_key(password))
+    return output_path
+
+def _update_payload(audio_path, output_path, build, password=None):
+    """通过内存映射改写音频中已有的容器，只修改变化的采样，见core._update_container"""
+    offset, size, channels, sampwidth = _wav_layout(audio_path)
+    return _update_mapped(audio_path, output_path, offset, (size,), lambda mm: _audio_slots(mm, sampwidth),
+                          build, _scatter_key(password))
+
+def hide_text_in_audio(audio_path, output_path, text, bits_per_sample=1, password=None):
+    """在音频中隐藏文本，bits_per_sample为每个采样使用的最低位数（1-4）"""
+    return _hide_payload(audio_path, output_path, _text_payload(text), bits_per_sample, password)
+
+def _read_slots(audio_path, n_slots):
+    """以只读方式映射WAV的data块，返回(所有采样最低字节的视图, 采样总数)，只有被访问的采样才会从磁盘读入"""
+    offset, size, channels, sampwidth = _wav_layout(audio_path)
+    if size == 0:
+        return np.zeros(0, dtype=np.uint8), 0
+    mm = np.memmap(audio_path, dtype=np.uint8, mode='r', offset=offset, shape=(size,))
+    slots = _audio_slots(mm, sampwidth)
+    return slots, slots.size
+
+def _extract_bytes(audio_path, scatter=None, passphrase=None):
+    """从音频中提取隐藏的原始数据"""
+    try:
+        return _extract_lazily(lambda n_slots: _read_slots(audio_path, n_slots), scatter=scatter, passphrase=passphrase)
+    except Exception as e:
+        logger.error("音频提取错误: %s", e)
+        return b""
+
+def extract_from_audio(audio_path, password=None, passphrase=None):
+    """从音频中提取隐藏文本"""
+    keys = _passphrase_keys(passphrase)
+    return _payload_text(_extract_bytes(audio_path, _scatter_key(password), keys), keys)
+
+def _carrier_scatter(audio_path, password):
+    """生成提取音频时使用的打乱密钥"""
+    return _scatter_key(password)
+
+def _carrier_slots(audio_path):
+    """只读取文件头，计算音频可用于隐写的采样数"""
+    offset, size, channels, sampwidth = _wav_layout(audio_path)
+    return size // sampwidth
+
+def _sample_values(raw, sampwidth):
+    """将(帧数, 声道数*采样字节数)的字节数组转换为(帧数, 声道数)的采样值，8位为无符号数，其余为有符号的小端序整数"""
+    if sampwidth == 1:
+        return raw
+    if sampwidth in (2, 4):
+        return raw.view(f'<i{sampwidth}')
+    # 24位采样按字节拼接后扩展符号位
+    samples = raw.reshape(raw.shape[0], -1, sampwidth).astype(np.int32)
+    value = samples[:, :, 0] | (samples[:, :, 1] << 8) | (samples[:, :, 2] << 16)
+    return (value ^ 0x800000) - 0x800000
+
+def _sample_tiles(audio_path, tile_samples):
+    """通过内存映射分块产出音频的采样值，每块为(声道数, 帧数)的数组，每行是同一声道中时间上相邻的采样"""
+    offset, size, channels, sampwidth = _wav_layout(audio_path)
+    frame_size = channels * sampwidth
+    mm = np.memmap(audio_path, dtype=np.uint8, mode='r', offset=offset, shape=(size // frame_size, frame_size))
+    frames = max(1, tile_samples // channels)
+    for start in range(0, mm.shape[0], frames):
+        yield _sample_values(np.ascontiguousarray(mm[start:start + frames]), sampwidth).T
+
+# 注册到载体后端注册表的函数，见api.register_backend
+BACKEND = {
+    'capacity': _carrier_slots, 'embed': _hide_payload, 'extract': _extract_bytes, 'probe': _read_slots,
+    'scatter': _carrier_scatter, 'samples': _sample_tiles, 'update': _update_payload
+}
@@ -0,0 +1,206 @@
+"""批量隐写和提取，以及把一个载荷分片隐写到多个载体中"""
+import concurrent.futures
+import logging
+import os
+from .analysis import _SCORE_THRESHOLD, _TILE_SAMPLES, analyze
+from .api import _carrier_slots, _detect, _extract_raw, _hide_payload, extract, hide_file, hide_text
+from .core import (
+    _CONTAINER_HEADER, _CONTAINER_MAGIC, _ECC_CODES, _SHARD_HEADER, _check_bits, _check_ecc, _compress_payload,
+    _ecc_payload, _encrypt_if, _file_payload, _head_slots, _pack_container, _text_payload, _unpack_container,
+    _unpack_payload
+)
+
+logger = logging.getLogger(__name__)
+
+def find_carriers(paths):
+    """展开文件和目录列表，返回其中所有受支持的载体文件路径
+
+    目录中的文件只读取文件头的前若干字节按魔数识别格式（无法识别时再看扩展名），不会完整打开文件。
+    """
+    carriers = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if _detect(os.path.join(root, name)) is not None:
+                        carriers.append(os.path.join(root, name))
+        else:
+            carriers.append(path)
+    return carriers
+
+def _output_key(path):
+    """输出路径去掉扩展名后的规范形式，只有扩展名不同的输出视为相同（图片载体可能改存为PNG）"""
+    return os.path.normcase(os.path.splitext(os.path.abspath(path))[0])
+
+def _check_outputs(output_paths):
+    """检查各载体的输出路径互不相同，只有扩展名不同的也视为相同，重复时抛出ValueError"""
+    seen = {}
+    for path in output_paths:
+        key = _output_key(path)
+        if key in seen:
+            raise ValueError(f"多个载体的输出路径相同: {seen[key]}, {path}")
+        seen[key] = path
+
+def _extract_worker(item):
+    """批量提取的工作进程函数"""
+    path, password, passphrase = item
+    return extract(path, password=password, passphrase=passphrase)
+
+def _analyze_worker(item):
+    """批量隐写分析的工作进程函数"""
+    path, threshold, tile_samples = item
+    return analyze(path, threshold, tile_samples)
+
+def _hide_worker(job):
+    """批量隐写的工作进程函数"""
+    job = dict(job)
+    carrier_path = job.pop('carrier_path')
+    output_path = job.pop('output_path')
+    carrier_type = job.pop('carrier_type', None)
+    if 'secret_path' in job:
+        return hide_file(carrier_path, output_path, job.pop('secret_path'), carrier_type, **job)
+    return hide_text(carrier_path, output_path, job.pop('secret_text'), carrier_type, **job)
+
+def _run_batch(func, items, keys, workers):
+    """在进程池中并行处理items，按完成顺序逐个产出结果，单个文件出错不会中断整个批次"""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(func, item): key for item, key in zip(items, keys)}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                yield {'path': futures[future], 'result': future.result(), 'error': None}
+            except Exception as e:
+                yield {'path': futures[future], 'result': None, 'error': f"{type(e).__name__}: {e}"}
+
+def batch_extract(paths, workers=None, password=None, passphrase=None):
+    """并行从多个载体中提取隐藏信息
+
+    paths可以包含文件和目录；workers为进程数，默认使用CPU核数；password和passphrase为隐写时使用的密码和口令。
+    按完成顺序逐个产出{'path': 载体路径, 'result': extract的返回值, 'error': 错误信息或None}。
+    """
+    carriers = find_carriers(paths)
+    return _run_batch(_extract_worker, [(path, password, passphrase) for path in carriers], carriers, workers)
+
+def batch_analyze(paths, workers=None, threshold=_SCORE_THRESHOLD, tile_samples=_TILE_SAMPLES):
+    """并行对多个载体进行隐写分析
+
+    paths可以包含文件和目录，目录中的文件只读取文件头识别格式；workers为进程数，默认使用CPU核数。
+    按完成顺序逐个产出{'path': 载体路径, 'result': analyze的返回值, 'error': 错误信息或None}。
+    """
+    carriers = find_carriers(paths)
+    return _run_batch(_analyze_worker, [(path, threshold, tile_samples) for path in carriers], carriers, workers)
+
+def batch_hide(jobs, workers=None):
+    """并行执行多个隐写任务
+
+    每个任务是一个字典，包含carrier_path、output_path、secret_text或secret_path，
+    以及可选的carrier_type（默认按文件头识别）、compression、bits、password、passphrase、ecc和adaptive。
+    按完成顺序逐个产出{'path': 载体路径, 'result': 输出路径, 'error': 错误信息或None}。
+    """
+    jobs = list(jobs)
+    return _run_batch(_hide_worker, jobs, [job['carrier_path'] for job in jobs], workers)
+
+def _shard_capacity(slots, k, ecc=None):
+    """计算一个载体能容纳的分片数据字节数"""
+    ecc_id = _ECC_CODES.get(ecc, 0)
+    stored = (slots - _head_slots(_CONTAINER_HEADER.size, bool(ecc_id))) * k // 8
+    # 按纠错编码的膨胀倍数换算为编码前的字节数
+    if ecc_id == _ECC_CODES['repeat']:
+        stored //= 3
+    elif ecc_id == _ECC_CODES['hamming']:
+        stored = stored * 8 // 14
+    return max(0, stored - _SHARD_HEADER.size)
+
+def _hide_shard_worker(job):
+    """分片隐写的工作进程函数"""
+    payload = _ecc_payload({'type': 'shard', 'filename': '', 'size': len(job['data']), 'chunks': [job['data']]}, job['ecc'])
+    return _hide_payload(job['carrier_path'], job['output_path'], payload, None, job['bits'], job['password'])
+
+def _extract_raw_worker(item):
+    """分片提取的工作进程函数"""
+    path, password = item
+    return _extract_raw(path, password)
+
+def hide_sharded(carrier_paths, output_dir, secret_text=None, secret_path=None, compression=None, bits=1, workers=None,
+                 password=None, passphrase=None, ecc=None):
+    """将一个较大的载荷拆分为多个分片，并行隐藏到一组载体中
+
+    载荷先按hide_text/hide_file的方式封装为完整容器，再按各载体的容量依次切分，
+    每个分片带有相同的消息ID、分片序号和分片总数。只用到能装下全部数据的前若干个载体。
+    password不为None时每个载体都按该密码打乱嵌入位置；passphrase不为None时先加密整个载荷再切分；
+    ecc为每个载体中的分片使用的纠错编码。
+    输出文件名为分片序号加载体的文件名，不同目录中的同名载体不会互相覆盖。返回按分片顺序排列的输出文件路径列表。
+    """
+    _check_bits(bits)
+    _check_ecc(ecc)
+    if (secret_text is None) == (secret_path is None):
+        raise ValueError("必须且只能指定secret_text或secret_path之一")
+    payload = _text_payload(secret_text) if secret_path is None else _file_payload(secret_path)
+    message = _pack_container(_encrypt_if(_compress_payload(payload, compression), passphrase))
+    
+    # 按载体容量切分，只读取文件头计算容量
+    pieces = []
+    offset = 0
+    for carrier_path in carrier_paths:
+        if offset >= len(message):
+            break
+        capacity = _shard_capacity(_carrier_slots(carrier_path), bits, ecc)
+        if capacity > 0:
+            pieces.append((carrier_path, message[offset:offset + capacity]))
+            offset += capacity
+    if offset < len(message):
+        raise ValueError(f"载体总容量不足，还差{len(message) - offset}字节")
+    
+    message_id = os.urandom(8)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [{
+        'carrier_path': carrier_path,
+        'output_path': os.path.join(output_dir, f"{index:04d}_{os.path.basename(carrier_path)}"),
+        'data': _SHARD_HEADER.pack(message_id, index, len(pieces)) + piece,
+        'bits': bits,
+        'password': password,
+        'ecc': ecc
+    } for index, (carrier_path, piece) in enumerate(pieces)]
+    _check_outputs(job['output_path'] for job in jobs)
+    
+    outputs = {}
+    errors = []
+    for item in _run_batch(_hide_shard_worker, jobs, range(len(jobs)), workers):
+        if item['error']:
+            errors.append(f"{jobs[item['path']]['carrier_path']}: {item['error']}")
+        else:
+            outputs[item['path']] = item['result']
+    if errors:
+        raise RuntimeError("部分分片隐写失败:\n" + "\n".join(errors))
+    logger.info("已将%d字节拆分为%d个分片", len(message), len(pieces))
+    return [outputs[index] for index in range(len(jobs))]
+
+def extract_set(paths, workers=None, password=None, passphrase=None):
+    """并行从一组载体中提取分片，并按序号重新组装为完整的隐藏信息
+
+    paths可以包含文件和目录，不含分片的载体会被忽略。返回值与extract相同；
+    分片不完整或属于多条不同消息时抛出ValueError。
+    """
+    carriers = find_carriers(paths)
+    shards = {}
+    for item in _run_batch(_extract_raw_worker, [(path, password) for path in carriers], carriers, workers):
+        if item['error'] or not item['result'].startswith(_CONTAINER_MAGIC):
+            continue
+        try:
+            result = _unpack_container(item['result'], passphrase)
+        except ValueError:
+            # 口令不匹配的加密载荷不属于这组分片
+            continue
+        if result['type'] == 'shard':
+            shards.setdefault(result['message_id'], {})[result['index']] = result
+    
+    if not shards:
+        raise ValueError("没有找到任何分片")
+    if len(shards) > 1:
+        raise ValueError(f"载体中包含{len(shards)}条不同消息的分片")
+    parts = next(iter(shards.values()))
+    count = next(iter(parts.values()))['count']
+    missing = [index for index in range(count) if index not in parts]
+    if missing:
+        raise ValueError(f"缺少分片: {missing}")
+    return _unpack_payload(b''.join(parts[index]['data'] for index in range(count)), passphrase)
@@ -0,0 +1,166 @@
+"""提取结果缓存：按载体内容的哈希缓存提取到的原始数据"""
+import collections
+import hashlib
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 提取结果缓存
+# 内存层按LRU淘汰，可选的磁盘层按文件修改时间淘汰最久未使用的条目
+_cache_lock = threading.Lock()
+_memory_cache = collections.OrderedDict()
+_cache_config = {'max_items': 128, 'max_bytes': 64 << 20, 'disk_dir': None, 'disk_max_bytes': 1 << 30}
+_cache_stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+# 计算载体哈希时每次读取的块大小
+_HASH_CHUNK_SIZE = 1 << 20
+# 载体文件的(真实路径, 大小, 修改时间, 状态改变时间, inode) -> 内容哈希，同一文件再次提取时不必重新读取全部内容
+_digest_index = collections.OrderedDict()
+_DIGEST_INDEX_SIZE = 4096
+
+def configure_cache(max_items=128, max_bytes=64 << 20, disk_dir=None, disk_max_bytes=1 << 30):
+    """设置提取结果缓存
+
+    max_items和max_bytes限制内存层的条目数和总字节数，max_items为0时不使用内存层；
+    disk_dir不为None时启用磁盘层，总大小超过disk_max_bytes时删除最久未使用的条目。
+    缓存只对当前进程有效，多个进程可以共享同一个磁盘层目录。
+    """
+    with _cache_lock:
+        _cache_config.update(max_items=max_items, max_bytes=max_bytes, disk_dir=disk_dir, disk_max_bytes=disk_max_bytes)
+        _evict_memory()
+    if disk_dir is not None:
+        os.makedirs(disk_dir, exist_ok=True)
+
+def cache_stats():
+    """返回缓存的命中/未命中次数，以及内存层当前的条目数和字节数"""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats['memory_items'] = len(_memory_cache)
+        stats['memory_bytes'] = sum(len(raw) for raw in _memory_cache.values())
+    return stats
+
+def clear_cache():
+    """清空内存层和磁盘层，并将计数归零"""
+    with _cache_lock:
+        _memory_cache.clear()
+        _digest_index.clear()
+        for name in _cache_stats:
+            _cache_stats[name] = 0
+        disk_dir = _cache_config['disk_dir']
+    if disk_dir is not None:
+        for entry in os.scandir(disk_dir):
+            if entry.name.endswith('.raw'):
+                os.remove(entry.path)
+
+def carrier_digest(carrier):
+    """计算载体内容的BLAKE2哈希，载体可以是文件路径、文件对象或字节串，文件对象读完后恢复原来的位置
+
+    返回值可以传给extract的digest参数：Web后端对每次上传只计算一次，内存中处理和保存为文件后处理的同一载体得到相同的缓存键。
+    文件路径按真实路径、大小、修改时间和inode记住已算出的哈希，同一文件再次提取时只需一次stat。
+    """
+    if isinstance(carrier, (bytes, bytearray, memoryview)):
+        return hashlib.blake2b(carrier, digest_size=20).hexdigest()
+    if not isinstance(carrier, (str, os.PathLike)):
+        digest = hashlib.blake2b(digest_size=20)
+        position = carrier.tell()
+        carrier.seek(0)
+        for chunk in iter(lambda: carrier.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        carrier.seek(position)
+        return digest.hexdigest()
+    
+    stat = os.stat(carrier)
+    identity = (os.path.realpath(carrier), stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino)
+    with _cache_lock:
+        if identity in _digest_index:
+            _digest_index.move_to_end(identity)
+            return _digest_index[identity]
+    digest = hashlib.blake2b(digest_size=20)
+    with open(carrier, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    with _cache_lock:
+        _digest_index[identity] = digest.hexdigest()
+        while len(_digest_index) > _DIGEST_INDEX_SIZE:
+            _digest_index.popitem(last=False)
+    return digest.hexdigest()
+
+def _cache_key(content_digest, carrier_format, password=None, passphrase=None):
+    """按载体内容的哈希、载体格式、提取密码和口令计算缓存键，文件名和修改时间不影响结果"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{content_digest}:{carrier_format or ''}".encode('utf-8') + b'\0')
+    # 只混入密码和口令的哈希，缓存键中不会出现它们本身；口令错误时只提取到第一个加密块，因此也要区分
+    for secret, tag in ((password, b'password'), (passphrase, b'passphrase')):
+        if secret is not None:
+            digest.update(tag + hashlib.sha256(secret.encode('utf-8')).digest())
+    return digest.hexdigest()
+
+def _evict_memory():
+    """按LRU顺序淘汰内存层中超出限制的条目，调用时需持有_cache_lock"""
+    total = sum(len(raw) for raw in _memory_cache.values())
+    while _memory_cache and (len(_memory_cache) > _cache_config['max_items'] or total > _cache_config['max_bytes']):
+        total -= len(_memory_cache.popitem(last=False)[1])
+
+def _cache_get(key):
+    """依次查找内存层和磁盘层，未命中时返回None"""
+    with _cache_lock:
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            _cache_stats['memory_hits'] += 1
+            return _memory_cache[key]
+        disk_dir = _cache_config['disk_dir']
+    
+    if disk_dir is not None:
+        path = os.path.join(disk_dir, key + '.raw')
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            # 更新修改时间，磁盘层按修改时间淘汰
+            os.utime(path)
+        except OSError:
+            pass
+        else:
+            with _cache_lock:
+                _cache_stats['disk_hits'] += 1
+                _memory_put(key, raw)
+            return raw
+    
+    with _cache_lock:
+        _cache_stats['misses'] += 1
+    return None
+
+def _memory_put(key, raw):
+    """将条目放入内存层，调用时需持有_cache_lock"""
+    if len(raw) <= _cache_config['max_bytes'] and _cache_config['max_items'] > 0:
+        _memory_cache[key] = raw
+        _memory_cache.move_to_end(key)
+        _evict_memory()
+
+def _cache_put(key, raw):
+    """将提取到的原始数据写入内存层和磁盘层"""
+    with _cache_lock:
+        _memory_put(key, raw)
+        disk_dir = _cache_config['disk_dir']
+        disk_max_bytes = _cache_config['disk_max_bytes']
+    if disk_dir is None or len(raw) > disk_max_bytes:
+        return
+    
+    try:
+        # 先写入临时文件再替换，其他进程不会读到不完整的条目
+        path = os.path.join(disk_dir, key + '.raw')
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(raw)
+        os.replace(temp_path, path)
+        
+        entries = [entry for entry in os.scandir(disk_dir) if entry.name.endswith('.raw')]
+        entries = sorted(((entry.stat(), entry.path) for entry in entries), key=lambda item: item[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, entry_path in entries:
+            if total <= disk_max_bytes:
+                break
+            os.remove(entry_path)
+            total -= stat.st_size
+    except OSError as e:
+        logger.warning("写入磁盘缓存失败: %s", e)
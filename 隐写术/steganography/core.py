@@ -0,0 +1,1050 @@
+"""隐写格式的核心实现：最低有效位读写、位置打乱、二进制容器、压缩、纠错编码和加密
+
+本模块只依赖numpy和标准库，各载体格式的读写在image、audio和video后端模块中实现。
+"""
+import base64
+import bz2
+import contextlib
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import lzma
+import os
+import shutil
+import struct
+import sys
+import time
+import zlib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 进度回调，由set_progress_callback设置
+_progress_callback = None
+
+def set_progress_callback(callback):
+    """设置进度回调，传入None取消
+
+    隐写和提取过程中会调用callback(stage, done, total)：stage为'bits'时表示已写入的载荷位数，
+    为'frames'时表示已处理的视频帧数；total未知时为None。回调只对当前进程有效。
+    """
+    global _progress_callback
+    _progress_callback = callback
+
+def _report_progress(stage, done, total=None):
+    """向进度回调报告进度"""
+    if _progress_callback is not None:
+        _progress_callback(stage, done, total)
+
+# 计时钩子，由add_timing_hook添加
+_timing_hooks = []
+
+def add_timing_hook(hook):
+    """添加计时钩子，每个阶段结束时调用hook(stage, seconds)
+
+    隐写时的阶段为'load'（复制并映射载体）、'decode'（解码图片/视频帧）、'plan'（自适应嵌入时计算纹理和嵌入顺序）、
+    'pack'（将数据转换为位平面的值）、'embed'（写入最低有效位）、'encode'（编码视频帧）和'save'（保存输出文件），
+    提取时为'decode'（读取载体）、'plan'、'extract'（读出最低有效位）和'unpack'（解析容器、解压）。
+    同一阶段可能分多次报告，钩子对当前进程的所有线程有效。
+    """
+    _timing_hooks.append(hook)
+
+def remove_timing_hook(hook):
+    """移除计时钩子"""
+    _timing_hooks.remove(hook)
+
+@contextlib.contextmanager
+def _span(stage):
+    """测量一个阶段的耗时并报告给计时钩子，没有钩子时不计时"""
+    if not _timing_hooks:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for hook in list(_timing_hooks):
+            hook(stage, elapsed)
+
+# 载荷容器格式
+# 魔数首字节0x89不可能出现在UTF-8文本的开头，因此不会与旧版本的纯文本/JSON载荷混淆
+_CONTAINER_MAGIC = b'\x89STG'
+_CONTAINER_VERSION = 1
+# 魔数、版本、载荷类型、标志位、文件名长度、载荷长度、CRC32校验和
+# 加密的容器在文件名的位置存放加密参数，真实文件名加密后放在载荷内容的开头
+_CONTAINER_HEADER = struct.Struct('>4sBBBHQI')
+_PAYLOAD_TYPES = {'text': 1, 'file': 2, 'shard': 3, 'records': 4}
+# 分片载荷的分片头：消息ID、分片序号、分片总数
+_SHARD_HEADER = struct.Struct('>8sII')
+# 多记录载荷由若干条记录依次组成，每条记录是一个不含纠错编码的完整容器，之前是记录的字节数
+_RECORD_HEADER = struct.Struct('>I')
+# 压缩编码，编号记录在容器标志位的低2位
+_CODECS = {'zlib': 1, 'lzma': 2, 'bz2': 3}
+_CODEC_MASK = 0x03
+_COMPRESSORS = {
+    'zlib': lambda: zlib.compressobj(9),
+    'lzma': lzma.LZMACompressor,
+    'bz2': bz2.BZ2Compressor
+}
+_DECOMPRESSORS = {1: zlib.decompress, 2: lzma.decompress, 3: bz2.decompress}
+# 载荷内容每个通道/采样使用的最低位数减1，记录在容器标志位的第2、3位
+_BITS_SHIFT = 2
+_BITS_MASK = 0x0C
+# 容器标志位的第4位表示载荷已加密
+_ENCRYPTED_FLAG = 0x10
+# 加密参数：scrypt盐值、nonce前缀、scrypt代价参数log2(N)、加密块大小log2
+_ENCRYPTION_HEADER = struct.Struct('>16s7sBB')
+_SCRYPT_LOG_N = 15
+_ENCRYPTION_CHUNK_LOG = 16
+_TAG_SIZE = 16
+# 容器标志位的第5-6位表示载荷使用的纠错编码
+_ECC_CODES = {'repeat': 1, 'hamming': 2}
+_ECC_SHIFT = 5
+_ECC_MASK = 0x60
+# 容器标志位的第7位表示载荷内容按纹理自适应地嵌入
+_ADAPTIVE_FLAG = 0x80
+# 自适应嵌入时像素每个通道使用的位数随纹理增加：3x3邻域的标准差达到1、3、7（以屏蔽的最低位为单位）时依次多用1位
+_TEXTURE_LEVELS = (1, 9, 49)
+# 流式嵌入时每次读取的块大小
+_STREAM_CHUNK_SIZE = 1 << 18
+# 解析长度前缀和容器头需要的通道/采样数（按三重重复码写入时为3倍）
+_HEAD_SLOTS = (32 + _CONTAINER_HEADER.size * 8) * 3
+# probe读取的通道/采样数，额外包含最长255字节的文件名
+_PROBE_SLOTS = _HEAD_SLOTS + 255 * 8 * 3
+
+def _text_payload(text):
+    """创建文本载荷描述"""
+    # 使用UTF-8编码确保正确处理中文
+    text_bytes = text.encode('utf-8')
+    return {'type': 'text', 'filename': '', 'size': len(text_bytes), 'chunks': [text_bytes]}
+
+def _file_payload(secret_path):
+    """创建文件载荷描述，文件内容在嵌入时才分块读取，不会整体读入内存"""
+    def chunks():
+        with open(secret_path, 'rb') as f:
+            while True:
+                block = f.read(_STREAM_CHUNK_SIZE)
+                if not block:
+                    break
+                yield block
+    
+    return {
+        'type': 'file',
+        'filename': os.path.basename(secret_path),
+        'size': os.path.getsize(secret_path),
+        'chunks': chunks()
+    }
+
+def _compress(codec, data):
+    """使用指定编码一次性压缩数据"""
+    compressor = _COMPRESSORS[codec]()
+    return compressor.compress(data) + compressor.flush()
+
+def _compress_payload(payload, compression):
+    """按指定方式压缩载荷，压缩编码记录在载荷的codec字段中
+
+    'auto'会尝试所有编码并保留最小的结果，压缩后不比原数据小时不压缩。
+    只有一个数据块时直接得到压缩结果和准确长度；文件较大时'auto'根据第一个数据块选择编码，
+    然后流式压缩其余数据，此时长度未知（size为None），容量在嵌入过程中检查。
+    """
+    if compression is None:
+        return payload
+    if compression != 'auto' and compression not in _CODECS:
+        raise ValueError(f"不支持的压缩方式: {compression}")
+    
+    chunks = iter(payload['chunks'])
+    first = next(chunks, b'')
+    second = next(chunks, None)
+    
+    if compression == 'auto':
+        candidates = {codec: _compress(codec, first) for codec in _CODECS}
+        codec = min(candidates, key=lambda name: len(candidates[name]))
+        if len(candidates[codec]) >= len(first):
+            logger.info("压缩无法减小数据，不进行压缩")
+            rest = [first] if second is None else itertools.chain([first, second], chunks)
+            return dict(payload, chunks=rest)
+        compressed = candidates[codec]
+    else:
+        codec = compression
+        compressed = _compress(codec, first) if second is None else None
+    
+    if second is None:
+        logger.info("使用%s压缩，%d字节 -> %d字节", codec, len(first), len(compressed))
+        return dict(payload, codec=codec, size=len(compressed), chunks=[compressed])
+    
+    def stream():
+        compressor = _COMPRESSORS[codec]()
+        for chunk in itertools.chain([first, second], chunks):
+            block = compressor.compress(chunk)
+            if block:
+                yield block
+        yield compressor.flush()
+    
+    logger.info("使用%s流式压缩", codec)
+    return dict(payload, codec=codec, size=None, chunks=stream())
+
+def _check_ecc(ecc):
+    """检查纠错编码是否有效"""
+    if ecc is not None and ecc not in _ECC_CODES:
+        raise ValueError(f"不支持的纠错编码: {ecc}")
+
+def _ecc_payload(payload, ecc):
+    """为载荷指定纠错编码，编码记录在载荷的ecc字段中"""
+    _check_ecc(ecc)
+    return payload if ecc is None else dict(payload, ecc=ecc)
+
+def _ecc_length(ecc_id, n):
+    """n字节数据经纠错编码后的存储字节数"""
+    if ecc_id == _ECC_CODES['repeat']:
+        return n * 3
+    if ecc_id == _ECC_CODES['hamming']:
+        return -(-n * 14 // 8)
+    return n
+
+def _ecc_encode_bits(bits, ecc_id):
+    """对比特数组进行纠错编码（长度须为8的倍数）"""
+    if ecc_id == _ECC_CODES['repeat']:
+        return np.repeat(bits, 3)
+    if ecc_id == _ECC_CODES['hamming']:
+        # 每4个数据位d1-d4编码为7位p1 p2 d1 p3 d2 d3 d4，校验位位于第1、2、4位
+        data = bits.reshape(-1, 4)
+        code = np.empty((len(data), 7), dtype=np.uint8)
+        code[:, 0] = data[:, 0] ^ data[:, 1] ^ data[:, 3]
+        code[:, 1] = data[:, 0] ^ data[:, 2] ^ data[:, 3]
+        code[:, 2] = data[:, 0]
+        code[:, 3] = data[:, 1] ^ data[:, 2] ^ data[:, 3]
+        code[:, 4:] = data[:, 1:]
+        return code.reshape(-1)
+    return bits
+
+def _ecc_decode(data, ecc_id, n):
+    """将纠错编码后的存储数据解码为n字节，数据不完整时只解码完整的部分"""
+    if not ecc_id:
+        return data[:n]
+    bits = _bytes_to_bits(data)
+    if ecc_id == _ECC_CODES['repeat']:
+        # 逐位多数表决
+        code = bits[:min(len(bits) // 24, n) * 24].reshape(-1, 3)
+        decoded = (code.sum(axis=1) >= 2).astype(np.uint8)
+        corrected = np.count_nonzero(code.min(axis=1) != code.max(axis=1))
+    else:
+        code = bits[:min(len(bits) // 14, n) * 14].reshape(-1, 7)
+        # 校验子即为出错位的位置（从1开始），为0表示没有错误
+        syndrome = ((code[:, 0] ^ code[:, 2] ^ code[:, 4] ^ code[:, 6]) |
+                    (code[:, 1] ^ code[:, 2] ^ code[:, 5] ^ code[:, 6]) << 1 |
+                    (code[:, 3] ^ code[:, 4] ^ code[:, 5] ^ code[:, 6]) << 2)
+        rows = np.flatnonzero(syndrome)
+        code[rows, syndrome[rows] - 1] ^= 1
+        decoded = code[:, [2, 4, 5, 6]].reshape(-1)
+        corrected = len(rows)
+    if corrected:
+        logger.info("纠错编码纠正了%d处错误", corrected)
+    return np.packbits(decoded).tobytes()
+
+def _derive_key(passphrase, salt, log_n):
+    """用scrypt从口令派生256位密钥"""
+    return hashlib.scrypt(passphrase.encode('utf-8'), salt=salt, n=1 << log_n, r=8, p=1,
+                          maxmem=256 * (1 << log_n) * 8, dklen=32)
+
+def _passphrase_keys(passphrase):
+    """返回一次提取使用的密钥函数keys(salt, log_n)，同一盐值的密钥只派生一次，验证口令和解密共用
+
+    派生出的密钥只保存在返回的函数中，提取结束后随之释放，不会在进程中留下口令。
+    passphrase为None时返回None，已经是密钥函数时原样返回。
+    """
+    if passphrase is None or callable(passphrase):
+        return passphrase
+    derived = {}
+    
+    def keys(salt, log_n):
+        if (salt, log_n) not in derived:
+            derived[salt, log_n] = _derive_key(passphrase, salt, log_n)
+        return derived[salt, log_n]
+    return keys
+
+def _encryption_params(params):
+    """解析加密参数，scrypt代价参数不是本版本写入的值时抛出ValueError
+
+    代价参数来自载体，不能信任：每加1，scrypt的内存和时间都会翻倍，因此在派生密钥之前拒绝。
+    """
+    salt, prefix, log_n, chunk_log = _ENCRYPTION_HEADER.unpack_from(params)
+    if log_n != _SCRYPT_LOG_N:
+        raise ValueError(f"不支持的加密参数: scrypt代价参数为2^{log_n}")
+    return salt, prefix, log_n, chunk_log
+
+def _aead(key):
+    """创建AES-GCM加密器"""
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError:
+        raise ImportError("需要安装cryptography库来加密载荷")
+    return AESGCM(key)
+
+def _chunk_nonce(prefix, index, last):
+    """每个加密块的nonce：nonce前缀、块序号和是否为最后一块，防止加密块被重排或截断"""
+    return prefix + index.to_bytes(4, byteorder='big') + bytes([last])
+
+def _encrypt_if(payload, passphrase):
+    """提供了口令时加密载荷"""
+    return payload if passphrase is None else _encrypt_payload(payload, passphrase)
+
+def _encrypt_payload(payload, passphrase):
+    """用口令对（压缩后的）载荷进行分块认证加密，加密参数记录在载荷的encryption字段中
+
+    明文依次为2字节文件名长度、文件名和载荷内容，按固定大小分块加密，每块带有16字节认证标签，
+    因此大文件同样是逐块读取、逐块加密，不需要整体读入内存。
+    """
+    salt = os.urandom(16)
+    prefix = os.urandom(7)
+    params = _ENCRYPTION_HEADER.pack(salt, prefix, _SCRYPT_LOG_N, _ENCRYPTION_CHUNK_LOG)
+    aead = _aead(_derive_key(passphrase, salt, _SCRYPT_LOG_N))
+    # 加密参数和载荷类型作为附加认证数据
+    aad = params + bytes([_PAYLOAD_TYPES[payload['type']]])
+    chunk_size = 1 << _ENCRYPTION_CHUNK_LOG
+    filename = payload['filename'].encode('utf-8')
+    
+    def stream():
+        buffer = bytearray(len(filename).to_bytes(2, byteorder='big') + filename)
+        index = 0
+        for chunk in payload['chunks']:
+            buffer += chunk
+            # 至少留下1字节作为最后一块，最后一块的nonce带有结束标记
+            while len(buffer) > chunk_size:
+                yield aead.encrypt(_chunk_nonce(prefix, index, 0), bytes(buffer[:chunk_size]), aad)
+                del buffer[:chunk_size]
+                index += 1
+        yield aead.encrypt(_chunk_nonce(prefix, index, 1), bytes(buffer), aad)
+    
+    size = None
+    if payload['size'] is not None:
+        plain = 2 + len(filename) + payload['size']
+        size = plain + _TAG_SIZE * -(-plain // chunk_size)
+    return dict(payload, filename='', encryption=params, size=size, chunks=stream())
+
+def _decrypt_blocks(body, params, type_id, keys):
+    """用密钥函数keys逐块解密并验证，返回明文块的列表；任一块的认证标签不匹配时立即抛出ValueError"""
+    salt, prefix, log_n, chunk_log = _encryption_params(params)
+    aead = _aead(keys(salt, log_n))
+    aad = params + bytes([type_id])
+    block_size = (1 << chunk_log) + _TAG_SIZE
+    total = max(1, -(-len(body) // block_size))
+    blocks = []
+    for index in range(total):
+        nonce = _chunk_nonce(prefix, index, int(index == total - 1))
+        try:
+            blocks.append(aead.decrypt(nonce, body[index * block_size:(index + 1) * block_size], aad))
+        except Exception:
+            raise ValueError("口令错误或数据已损坏，无法解密")
+    return blocks
+
+def _first_block_size(header):
+    """加密的容器返回第一个加密块（含认证标签）的最大长度，未加密时返回None"""
+    flags = _CONTAINER_HEADER.unpack_from(header)[3]
+    if not flags & _ENCRYPTED_FLAG or len(header) < _CONTAINER_HEADER.size + _ENCRYPTION_HEADER.size:
+        return None
+    chunk_log = _ENCRYPTION_HEADER.unpack_from(header, _CONTAINER_HEADER.size)[3]
+    return (1 << chunk_log) + _TAG_SIZE
+
+def _passphrase_matches(header, first_block, keys):
+    """只用第一个加密块的认证标签验证密钥函数keys派生出的密钥，加密参数不受支持时同样返回False"""
+    type_id, length = _CONTAINER_HEADER.unpack_from(header)[2:6:3]
+    params = header[_CONTAINER_HEADER.size:_CONTAINER_HEADER.size + _ENCRYPTION_HEADER.size]
+    try:
+        salt, prefix, log_n, chunk_log = _encryption_params(params)
+    except ValueError:
+        return False
+    aad = params + bytes([type_id])
+    last = int(length <= (1 << chunk_log) + _TAG_SIZE)
+    try:
+        _aead(keys(salt, log_n)).decrypt(_chunk_nonce(prefix, 0, last), first_block, aad)
+    except ImportError:
+        raise
+    except Exception:
+        return False
+    return True
+
+def _unpack_container(data, passphrase=None):
+    """解析容器格式的数据，校验失败时返回空文本；载荷已加密而口令缺失或错误时抛出ValueError
+
+    passphrase可以是口令，也可以是_passphrase_keys返回的密钥函数，后者可以复用提取时验证口令已派生的密钥。
+    """
+    passphrase = _passphrase_keys(passphrase)
+    if len(data) < _CONTAINER_HEADER.size:
+        logger.warning("容器头不完整")
+        return {'type': 'text', 'data': ""}
+    
+    magic, version, type_id, flags, name_length, length, checksum = _CONTAINER_HEADER.unpack_from(data)
+    if version > _CONTAINER_VERSION:
+        logger.warning("不支持的容器版本: %d", version)
+        return {'type': 'text', 'data': ""}
+    
+    name_end = _CONTAINER_HEADER.size + name_length
+    # 先纠正存储数据中的错误，CRC32校验的是纠错解码后的数据
+    payload = _ecc_decode(data[name_end:], (flags & _ECC_MASK) >> _ECC_SHIFT, length)
+    if flags & _ENCRYPTED_FLAG:
+        if passphrase is None:
+            raise ValueError("载体中的数据已加密，需要提供口令")
+        # 先解密：口令错误时提取到的数据只包含第一个加密块，不能先按完整长度校验
+        plain = b''.join(_decrypt_blocks(payload, data[_CONTAINER_HEADER.size:name_end], type_id, passphrase))
+        name_length = int.from_bytes(plain[:2], byteorder='big')
+        filename = plain[2:2 + name_length].decode('utf-8', errors='replace')
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            logger.warning("数据校验失败，载体可能已损坏")
+            return {'type': 'text', 'data': ""}
+        payload = plain[2 + name_length:]
+    else:
+        filename = data[_CONTAINER_HEADER.size:name_end].decode('utf-8', errors='replace')
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            logger.warning("数据校验失败，载体可能已损坏")
+            return {'type': 'text', 'data': ""}
+    
+    # 按标志位记录的编码解压
+    codec_id = flags & _CODEC_MASK
+    if codec_id:
+        try:
+            payload = _DECOMPRESSORS[codec_id](payload)
+        except Exception as e:
+            logger.warning("解压失败: %s", e)
+            return {'type': 'text', 'data': ""}
+    
+    if type_id == _PAYLOAD_TYPES['file']:
+        return {
+            'type': 'file',
+            'filename': filename or 'extracted_file',
+            'data': payload
+        }
+    if type_id == _PAYLOAD_TYPES['shard']:
+        if len(payload) < _SHARD_HEADER.size:
+            logger.warning("分片头不完整")
+            return {'type': 'text', 'data': ""}
+        message_id, index, count = _SHARD_HEADER.unpack_from(payload)
+        return {
+            'type': 'shard',
+            'message_id': message_id.hex(),
+            'index': index,
+            'count': count,
+            'data': payload[_SHARD_HEADER.size:]
+        }
+    if type_id == _PAYLOAD_TYPES['records']:
+        return {
+            'type': 'records',
+            'records': [_unpack_container(record, passphrase) for record in _split_records(payload)]
+        }
+    return {
+        'type': 'text',
+        'data': _decode_text(payload)
+    }
+
+def _unpack_payload(data, passphrase=None):
+    """解析提取到的数据，兼容旧版本的纯文本和JSON文件格式"""
+    if data[:4] == _CONTAINER_MAGIC:
+        return _unpack_container(data, passphrase)
+    
+    # 旧版本格式：纯UTF-8文本，文件以JSON+Base64封装
+    extracted_text = _decode_text(data) if data else ""
+    
+    # 尝试解析JSON
+    try:
+        data = json.loads(extracted_text)
+        if isinstance(data, dict) and data.get('type') == 'file':
+            # 这是一个文件，返回文件信息和二进制数据
+            filename = data.get('filename', 'extracted_file')
+            file_data = base64.b64decode(data['data'])
+            return {
+                'type': 'file',
+                'filename': filename,
+                'data': file_data
+            }
+        else:
+            # 这是普通文本
+            return {
+                'type': 'text',
+                'data': extracted_text
+            }
+    except (json.JSONDecodeError, TypeError):
+        # 不是JSON格式或者是None，当作普通文本返回
+        return {
+            'type': 'text',
+            'data': extracted_text if extracted_text else ""
+        }
+
+def _records_payload(records):
+    """将多条记录（各自封装好的容器字节串）合并为多记录载荷"""
+    chunks = [part for record in records for part in (_RECORD_HEADER.pack(len(record)), record)]
+    return {'type': 'records', 'filename': '', 'size': sum(len(chunk) for chunk in chunks), 'chunks': chunks}
+
+def _split_records(data):
+    """将多记录载荷拆分为各条记录的容器字节串"""
+    records = []
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        length = _RECORD_HEADER.unpack_from(data, offset)[0]
+        offset += _RECORD_HEADER.size
+        records.append(data[offset:offset + length])
+        offset += length
+    return records
+
+def _container_records(data):
+    """返回提取到的容器（容器头及纠错编码后的载荷）中的各条记录
+
+    单条载荷的容器转换为一条记录：去掉纠错编码，只保留压缩和加密标志，位数和自适应嵌入等只与嵌入方式有关的标志由外层容器记录。
+    """
+    magic, version, type_id, flags, name_length, length, checksum = _CONTAINER_HEADER.unpack_from(data)
+    name_end = _CONTAINER_HEADER.size + name_length
+    payload = _ecc_decode(data[name_end:], (flags & _ECC_MASK) >> _ECC_SHIFT, length)
+    if len(payload) != length or zlib.crc32(payload) != checksum:
+        raise ValueError("载体中的数据校验失败，无法追加记录")
+    if type_id == _PAYLOAD_TYPES['records']:
+        return _split_records(payload)
+    header = _CONTAINER_HEADER.pack(magic, version, type_id, flags & (_CODEC_MASK | _ENCRYPTED_FLAG), name_length,
+                                    length, checksum)
+    return [header + data[_CONTAINER_HEADER.size:name_end] + payload]
+
+def _payload_text(data, passphrase=None):
+    """从提取到的数据中取出文本，供只返回文本的旧接口使用"""
+    if data[:4] != _CONTAINER_MAGIC:
+        return _decode_text(data) if data else ""
+    result = _unpack_container(data, passphrase)
+    if result['type'] == 'file':
+        logger.warning("载体中隐藏的是文件，请使用extract提取")
+        return ""
+    if result['type'] == 'shard':
+        logger.warning("载体中隐藏的是分片，请使用extract_set提取")
+        return ""
+    if result['type'] == 'records':
+        logger.warning("载体中隐藏的是多条记录，请使用extract提取")
+        return ""
+    return result['data']
+
+# 位平面工具
+def _bytes_to_bits(data):
+    """将字节串展开为比特数组（高位在前）"""
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+def _bits_to_values(bits, k):
+    """将比特数组每k位合并为一个k位整数（长度须为k的倍数）"""
+    if k == 1:
+        return bits
+    return np.packbits(bits.reshape(-1, k), axis=1)[:, 0] >> (8 - k)
+
+def _values_to_bits(values, k):
+    """将k位整数数组展开为比特数组（高位在前）"""
+    if k == 1:
+        return values.astype(np.uint8)
+    return np.unpackbits(values.astype(np.uint8)[:, None], axis=1)[:, 8 - k:].reshape(-1)
+
+def _write_lsb(slots, slot_offset, values, k=1, scatter=None):
+    """将k位整数写入slots的最低k位（slots按C顺序展平即为嵌入顺序），只复制涉及的行
+
+    scatter不为None时，第i个嵌入位置由密钥确定的伪随机排列映射到slots中的位置。
+    """
+    if scatter is not None:
+        index = np.unravel_index(_scatter_positions(scatter, slots.size, slot_offset, slot_offset + len(values)), slots.shape)
+        slots[index] = (slots[index] >> k << k) | values
+        return
+    row = slots[0].size
+    first = slot_offset // row
+    last = -(-(slot_offset + len(values)) // row)
+    block = slots[first:last]
+    flat = block.reshape(-1)
+    start = slot_offset - first * row
+    target = flat[start:start + len(values)]
+    flat[start:start + len(values)] = (target >> k << k) | values
+    block[...] = flat.reshape(block.shape)
+
+def _read_lsb(slots, slot_offset, n_bytes, k=1, scatter=None):
+    """从slots的指定位置开始，按每个位置k位读取n_bytes个字节，只访问所需的行"""
+    n_bits = n_bytes * 8
+    n_slots = -(-n_bits // k)
+    if scatter is not None:
+        index = np.unravel_index(_scatter_positions(scatter, slots.size, slot_offset, slot_offset + n_slots), slots.shape)
+        return np.packbits(_values_to_bits(slots[index] & ((1 << k) - 1), k)[:n_bits]).tobytes()
+    row = slots[0].size
+    first = slot_offset // row
+    last = -(-(slot_offset + n_slots) // row)
+    values = slots[first:last].reshape(-1) & ((1 << k) - 1)
+    start = slot_offset - first * row
+    return np.packbits(_values_to_bits(values[start:start + n_slots], k)[:n_bits]).tobytes()
+
+# 按密码打乱嵌入位置时Feistel网络的轮数
+_SCATTER_ROUNDS = 4
+
+def _scatter_key(password, block=None):
+    """由密码生成打乱嵌入位置的密钥，password为None时返回None
+
+    block为None时在整个载体内打乱；视频逐帧写入，block为每帧的位置数，只在每帧内部打乱。
+    """
+    if password is None:
+        return None
+    return hashlib.sha256(b'steganography-scatter\0' + password.encode('utf-8')).digest(), block
+
+@functools.lru_cache(maxsize=16)
+def _scatter_tables(digest, half_bits):
+    """用密钥播种NumPy随机数生成器，生成Feistel网络各轮的轮函数查找表"""
+    rng = np.random.default_rng([int(word) for word in np.frombuffer(digest, dtype=np.uint32)])
+    return rng.integers(0, 1 << half_bits, size=(_SCATTER_ROUNDS, 1 << half_bits), dtype=np.uint32)
+
+def _permute(digest, n, indices):
+    """计算[0, n)上由密钥确定的伪随机排列在indices处的值
+
+    使用查找表轮函数的Feistel网络在[0, 4^h)上构造排列，超出n的值继续加密直到落入范围内（循环行走），
+    因此只需计算用到的位置，不必生成整个排列。
+    """
+    half_bits = max(1, -(-max(n - 1, 1).bit_length() // 2))
+    tables = _scatter_tables(digest, half_bits)
+    shift = np.uint64(half_bits)
+    mask = np.uint64((1 << half_bits) - 1)
+    result = np.empty(len(indices), dtype=np.int64)
+    todo = np.arange(len(indices))
+    values = indices.astype(np.uint64)
+    while todo.size:
+        left = values >> shift
+        right = values & mask
+        for table in tables:
+            left, right = right, left ^ table[right]
+        values = (left << shift) | right
+        inside = values < n
+        result[todo[inside]] = values[inside]
+        todo = todo[~inside]
+        values = values[~inside]
+    return result
+
+def _scatter_positions(scatter, n, start, stop):
+    """返回第start到stop个嵌入位置在slots（共n个位置）中的下标"""
+    digest, block = scatter
+    block = block or n
+    indices = np.arange(start, stop, dtype=np.int64)
+    base = indices // block * block
+    return base + _permute(digest, block, indices - base)
+
+def _check_bits(k):
+    """检查每个通道/采样使用的最低位数是否有效"""
+    if k not in (1, 2, 3, 4):
+        raise ValueError(f"每个通道/采样使用的最低位数必须在1到4之间: {k}")
+
+def _name_field(payload):
+    """容器头之后的变长部分：未加密时为文件名，加密时为加密参数"""
+    return payload.get('encryption') or payload['filename'].encode('utf-8')
+
+def _head_slots(header_length, repeated=False):
+    """长度前缀和容器头占用的通道/采样数，repeated为True时按三重重复码写入"""
+    return (32 + header_length * 8) * (3 if repeated else 1)
+
+def _head_bits(data_length, header, ecc_id=0):
+    """生成长度前缀和容器头的比特，使用纠错编码的载荷按三重重复码写入"""
+    bits = _bytes_to_bits(data_length.to_bytes(4, byteorder='big') + header)
+    return _ecc_encode_bits(bits, _ECC_CODES['repeat']) if ecc_id else bits
+
+def _read_head(slots, bit_offset, n_bytes, repeated=False, scatter=None):
+    """从长度前缀和容器头所在的区域读取n_bytes个字节，bit_offset为未编码时的位偏移"""
+    if not repeated:
+        return _read_lsb(slots, bit_offset, n_bytes, scatter=scatter)
+    return _ecc_decode(_read_lsb(slots, bit_offset * 3, n_bytes * 3, scatter=scatter), _ECC_CODES['repeat'], n_bytes)
+
+def _container_slots(payload, k=1):
+    """计算嵌入载荷至少需要的通道/采样数
+
+    长度前缀和容器头固定使用最低1位，以便提取时先读出位数；载荷内容使用最低k位。
+    """
+    ecc_id = _ECC_CODES.get(payload.get('ecc'), 0)
+    header_length = _CONTAINER_HEADER.size + len(_name_field(payload))
+    return _head_slots(header_length, bool(ecc_id)) + -(-_ecc_length(ecc_id, payload['size'] or 0) * 8 // k)
+
+def _container_header(payload, length, checksum, k=1):
+    """生成容器头（包括其后的文件名或加密参数），length和checksum为纠错编码前的载荷长度和CRC32"""
+    name_field = _name_field(payload)
+    flags = (_CODECS.get(payload.get('codec'), 0) | ((k - 1) << _BITS_SHIFT) |
+             (_ECC_CODES.get(payload.get('ecc'), 0) << _ECC_SHIFT))
+    if 'encryption' in payload:
+        flags |= _ENCRYPTED_FLAG
+    if payload.get('adaptive'):
+        flags |= _ADAPTIVE_FLAG
+    return _CONTAINER_HEADER.pack(_CONTAINER_MAGIC, _CONTAINER_VERSION, _PAYLOAD_TYPES[payload['type']],
+                                  flags, len(name_field), length, checksum) + name_field
+
+def _pack_container(payload, k=1):
+    """将载荷整体封装为容器字节串，用于分片、视频等需要在内存中处理整个容器的场合"""
+    body = b''.join(payload['chunks'])
+    ecc_id = _ECC_CODES.get(payload.get('ecc'), 0)
+    stored = np.packbits(_ecc_encode_bits(_bytes_to_bits(body), ecc_id)).tobytes() if ecc_id else body
+    return _container_header(payload, len(body), zlib.crc32(body), k) + stored
+
+def _embed_payload(slots, payload, k=1, scatter=None):
+    """将载荷封装为容器后逐块写入slots，返回载荷的存储长度，内存占用只与块大小有关
+
+    载荷内容先写入容器头之后的位置，同时增量计算长度和CRC32，最后再回填长度前缀和容器头。
+    载荷的adaptive字段为True时slots须为(高, 宽, 颜色通道数)的图片，载荷内容按_adaptive_plan的顺序写入，
+    此时需要为整张图片计算纹理。
+    """
+    ecc_id = _ECC_CODES.get(payload.get('ecc'), 0)
+    header_length = _CONTAINER_HEADER.size + len(_name_field(payload))
+    offset = _head_slots(header_length, bool(ecc_id))
+    plan = None
+    if payload.get('adaptive'):
+        with _span('plan'):
+            plan = _adaptive_plan(slots, k, offset, scatter)
+    # 自适应嵌入时已写入的位数
+    written = 0
+    length = 0
+    encoded_bits = 0
+    checksum = 0
+    total_bits = payload['size'] * 8 if payload['size'] is not None else None
+    # 数据块的位数不一定是k的倍数，剩余的位留到下一块一起写入
+    pending = np.zeros(0, dtype=np.uint8)
+    for chunk in itertools.chain(payload['chunks'], [None]):
+        if chunk is None:
+            # 纠错编码后的位数不一定是8的倍数，先补齐到整字节，最后不足k位的部分再补0
+            bits = np.concatenate([pending, np.zeros(-encoded_bits % 8, dtype=np.uint8)])
+            if plan is None:
+                bits = np.concatenate([bits, np.zeros(-len(bits) % k, dtype=np.uint8)])
+        else:
+            chunk_bits = _ecc_encode_bits(_bytes_to_bits(chunk), ecc_id)
+            bits = np.concatenate([pending, chunk_bits])
+            encoded_bits += len(chunk_bits)
+            length += len(chunk)
+            checksum = zlib.crc32(chunk, checksum)
+        if plan is not None:
+            # 自适应嵌入逐位写入，每个像素使用的位数由纹理决定
+            with _span('embed'):
+                _write_plan(slots, plan, written, bits)
+            written += len(bits)
+        else:
+            usable = len(bits) - len(bits) % k
+            pending = bits[usable:]
+            with _span('pack'):
+                values = _bits_to_values(bits[:usable], k)
+            if offset + len(values) > slots.size:
+                raise ValueError("载体容量不足以隐藏所有数据")
+            with _span('embed'):
+                _write_lsb(slots, offset, values, k, scatter)
+            offset += len(values)
+        _report_progress('bits', length * 8, total_bits)
+    
+    header = _container_header(payload, length, checksum, k)
+    _write_lsb(slots, 0, _head_bits(header_length + -(-encoded_bits // 8), header, ecc_id), scatter=scatter)
+    return length
+
+def _embed_mapped(carrier_path, output_path, offset, shape, make_slots, payload, k=1, scatter=None):
+    """复制载体后通过内存映射修改输出文件，嵌入失败时删除不完整的输出文件"""
+    with _span('load'):
+        shutil.copyfile(carrier_path, output_path)
+        mm = np.memmap(output_path, dtype=np.uint8, mode='r+', offset=offset, shape=shape)
+    try:
+        length = _embed_payload(make_slots(mm), payload, k, scatter)
+        with _span('save'):
+            mm.flush()
+    except Exception:
+        del mm
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+        raise
+    del mm
+    return length
+
+def _update_container(slots, build, scatter=None):
+    """原地改写slots中已有的容器，返回改写的存储字节数（包括容器头），新旧容器完全相同时返回0且不写入
+
+    build(data)由原有容器的数据（容器头及纠错编码后的载荷）生成新的载荷，新容器沿用原容器的位数、纠错编码和自适应嵌入方式。
+    新旧载荷的存储数据逐字节比较，只重写从第一个不同的字节到最后一个不同的字节所在的位置，再重写长度前缀和容器头，
+    因此追加记录或修改少量字节时写入量与改动的大小成正比。容量不足时在写入前抛出ValueError，载体保持不变。
+    """
+    layout = _payload_layout(slots, slots.size, scatter)
+    if layout is None or layout[1] == 0:
+        raise ValueError("载体中没有找到隐写容器")
+    data_length, header_length, k, body_offset = layout
+    with _span('extract'):
+        header = _read_head(slots, 32, header_length, body_offset != _head_slots(header_length), scatter)
+    flags = _CONTAINER_HEADER.unpack_from(header)[3]
+    ecc_id = (flags & _ECC_MASK) >> _ECC_SHIFT
+    plan = None
+    if flags & _ADAPTIVE_FLAG:
+        with _span('plan'):
+            plan = _adaptive_plan(slots, k, body_offset, scatter)
+    with _span('extract'):
+        old = _read_body(slots, data_length - header_length, k, body_offset, scatter, plan)
+    
+    ecc_names = {value: name for name, value in _ECC_CODES.items()}
+    payload = dict(build(header + old), ecc=ecc_names.get(ecc_id), adaptive=plan is not None)
+    with _span('pack'):
+        data = _pack_container(payload, k)
+    if data == header + old:
+        return 0
+    new_header_length = _CONTAINER_HEADER.size + len(_name_field(payload))
+    new_offset = _head_slots(new_header_length, bool(ecc_id))
+    body = np.frombuffer(data, dtype=np.uint8, offset=new_header_length)
+    if plan is not None and new_offset != body_offset:
+        # 容器头的长度变化后，参与排列的像素也随之变化
+        with _span('plan'):
+            plan = _adaptive_plan(slots, k, new_offset, scatter)
+    if plan is not None:
+        capacity = int(plan[2][-1]) if plan[2].size else 0
+    else:
+        capacity = max(0, slots.size - new_offset) * k
+    if len(body) * 8 > capacity:
+        raise ValueError("载体容量不足以隐藏所有数据")
+    
+    # 载荷内容的起始位置不变时只重写不同的部分，新载荷比原来长时超出的部分都要写入
+    start, stop = 0, len(body)
+    if new_offset == body_offset:
+        old = np.frombuffer(old, dtype=np.uint8)
+        common = min(len(old), len(body))
+        changed = np.flatnonzero(old[:common] != body[:common])
+        start = int(changed[0]) if changed.size else common
+        if len(body) == common:
+            stop = int(changed[-1]) + 1 if changed.size else start
+    bits = _bytes_to_bits(body)
+    with _span('embed'):
+        if plan is not None:
+            _write_plan(slots, plan, start * 8, bits[start * 8:stop * 8])
+        elif stop > start:
+            # 按k位对齐到完整的位置，边界位置中未改变的位原样写回
+            first = start * 8 // k
+            last = -(-stop * 8 // k)
+            bits = np.concatenate([bits, np.zeros(-len(bits) % k, dtype=np.uint8)])
+            _write_lsb(slots, new_offset + first, _bits_to_values(bits[first * k:last * k], k), k, scatter)
+        _write_lsb(slots, 0, _head_bits(len(data), data[:new_header_length], ecc_id), scatter=scatter)
+    logger.info("已改写容器中%d字节中的%d字节", len(data), stop - start + new_header_length)
+    return stop - start + new_header_length
+
+def _update_mapped(carrier_path, output_path, offset, shape, make_slots, build, scatter=None):
+    """通过内存映射改写载体中已有的容器，返回修改的文件路径
+
+    output_path为None或与载体相同时直接修改载体文件，否则先复制载体，改写失败时删除不完整的输出文件。
+    """
+    in_place = output_path is None or os.path.abspath(output_path) == os.path.abspath(carrier_path)
+    target = carrier_path if in_place else output_path
+    with _span('load'):
+        if not in_place:
+            shutil.copyfile(carrier_path, output_path)
+        mm = np.memmap(target, dtype=np.uint8, mode='r+', offset=offset, shape=shape)
+    try:
+        if _update_container(make_slots(mm), build, scatter):
+            with _span('save'):
+                mm.flush()
+    except Exception:
+        del mm
+        if not in_place:
+            try:
+                os.remove(output_path)
+            except OSError:
+                pass
+        raise
+    del mm
+    return target
+
+def _box_sum(values):
+    """计算每个元素3x3邻域（边缘按最近的元素延伸）之和"""
+    padded = np.pad(values, 1, mode='edge')
+    rows = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    return rows[:-2] + rows[1:-1] + rows[2:]
+
+def _adaptive_plan(slots, k, head_slots, scatter=None):
+    """计算自适应嵌入的顺序，返回(像素顺序, 每个像素的每个颜色通道使用的位数, 累计位数, 颜色通道数)
+
+    slots为(高, 宽, 颜色通道数)的图片。纹理为屏蔽最低k位后各通道之和在3x3邻域内的方差，全部用整数计算，
+    嵌入只改变最低k位，提取时能由隐写后的图片算出完全相同的顺序。像素按纹理从强到弱排列，纹理越强每个通道使用的位数越多
+    （1到k位），平坦区域排在最后；长度前缀和容器头占用的前head_slots个位置所在的像素不参与排列。
+    scatter不为None时纹理相同的像素按密码确定的伪随机顺序排列，否则按行列顺序排列。
+    """
+    height, width, channels = slots.shape
+    n = height * width
+    # 8位图片的邻域平方和不超过int32的范围
+    dtype = np.int32 if slots.dtype.itemsize == 1 else np.int64
+    # 逐通道相加比沿长度为3的轴求和快得多
+    gray = np.zeros((height, width), dtype=dtype)
+    for channel in range(channels):
+        gray += slots[:, :, channel] >> k
+    total = _box_sum(gray)
+    # 9倍邻域平方和减去邻域和的平方，等于81倍的方差
+    texture = (9 * _box_sum(gray * gray) - total * total).ravel()
+    del gray, total
+    bits = np.ones(n, dtype=np.uint8)
+    for level in _TEXTURE_LEVELS[:k - 1]:
+        bits += texture >= 81 * level
+    # 纹理按对数刻度量化为16位整数（相对精度约0.4%，frexp对整数是精确的），稳定排序时NumPy使用基数排序
+    mantissa, exponent = np.frexp(texture)
+    key = np.where(texture > 0, exponent * 256 + ((mantissa - 0.5) * 512).astype(np.int32), 0).astype(np.uint16)
+    del texture, mantissa, exponent
+    
+    order = np.arange(n, dtype=np.int64) if scatter is None else _scatter_positions((scatter[0], None), n, 0, n)
+    order = order[np.argsort(~key[order], kind='stable')]
+    used = np.zeros(n, dtype=bool)
+    head = np.arange(head_slots) if scatter is None else _scatter_positions(scatter, slots.size, 0, head_slots)
+    used[head // channels] = True
+    order = order[~used[order]]
+    bits = bits[order]
+    return order, bits, np.cumsum(bits, dtype=np.int64) * channels, channels
+
+def _plan_bits(plan, start, stop):
+    """返回自适应嵌入的第start到stop位所在的(通道位置, 位平面)，位置为slots按C顺序展平后的下标"""
+    order, bits, cumulative, channels = plan
+    if stop > (cumulative[-1] if cumulative.size else 0):
+        raise ValueError("载体容量不足以隐藏所有数据")
+    if stop <= start:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    first = np.searchsorted(cumulative, start, side='right')
+    last = np.searchsorted(cumulative, stop - 1, side='right') + 1
+    # 每个像素依次写入各颜色通道，每个通道从高位到低位
+    b = bits[first:last].astype(np.int64)
+    per_pixel = b * channels
+    offsets = np.cumsum(per_pixel) - per_pixel
+    j = np.arange(int(per_pixel.sum()), dtype=np.int64) - np.repeat(offsets, per_pixel)
+    b = np.repeat(b, per_pixel)
+    index = np.repeat(order[first:last] * channels, per_pixel) + j // b
+    plane = (b - 1 - j % b).astype(np.uint8)
+    skip = start - (cumulative[first] - per_pixel[0])
+    return index[skip:skip + stop - start], plane[skip:skip + stop - start]
+
+def _write_plan(slots, plan, start, bits):
+    """将比特写入自适应嵌入的第start位开始的位置"""
+    index, plane = _plan_bits(plan, start, start + len(bits))
+    if not len(index):
+        return
+    # 同一通道的各位在顺序中相邻，合并后一次写入
+    groups = np.flatnonzero(np.concatenate([[True], index[1:] != index[:-1]]))
+    mask = np.bitwise_or.reduceat(np.left_shift(np.uint8(1), plane), groups).astype(slots.dtype)
+    values = np.bitwise_or.reduceat(bits << plane, groups)
+    # 连续存储的数组按展平后的下标访问，内存映射的视图等非连续数组按多维下标访问
+    target = slots.reshape(-1) if slots.flags.c_contiguous else slots
+    position = index[groups] if target is not slots else np.unravel_index(index[groups], slots.shape)
+    target[position] = (target[position] & ~mask) | values
+
+def _decode_text(byte_array):
+    """将提取到的字节解码为UTF-8文本，失败时尽可能多地解码有效字节"""
+    try:
+        result = byte_array.decode('utf-8')
+        logger.debug("成功提取文本，长度: %d", len(result))
+        return result
+    except UnicodeDecodeError as e:
+        # 第一个无效字节之前的部分就是能解码的最长前缀，不需要逐个长度重试
+        logger.warning("UTF-8解码失败，只保留第%d字节之前的部分", e.start)
+        return byte_array[:e.start].decode('utf-8')
+
+def _payload_layout(slots, capacity, scatter=None):
+    """从slots开头解析长度前缀和容器头，返回(数据长度, 容器头长度, 载荷内容每个位置的位数, 载荷内容的起始位置)
+
+    capacity为整个载体的通道/采样总数，声明的数据长度超出载体容量时返回None。
+    """
+    # 容器头固定使用最低1位，从中读出载荷内容使用的位数；旧版本格式的数据全部使用最低1位
+    header_length = 0
+    k = 1
+    repeated = False
+    header = b""
+    # 使用纠错编码的载荷，长度前缀和容器头按三重重复码写入
+    for candidate in (False, True):
+        if slots.size < _head_slots(_CONTAINER_HEADER.size, candidate):
+            break
+        header = _read_head(slots, 32, _CONTAINER_HEADER.size, candidate, scatter)
+        if header[:4] == _CONTAINER_MAGIC:
+            repeated = candidate
+            break
+    
+    # 解析32位的长度信息
+    data_length = int.from_bytes(_read_head(slots, 0, 4, repeated, scatter), byteorder='big')
+    logger.debug("解析到的数据长度: %d", data_length)
+    if header[:4] == _CONTAINER_MAGIC:
+        flags, name_length, length = _CONTAINER_HEADER.unpack(header)[3:6]
+        header_length = _CONTAINER_HEADER.size + name_length
+        k = ((flags & _BITS_MASK) >> _BITS_SHIFT) + 1
+        # 数据长度可以由容器头推算，长度前缀中的个别位出错时以容器头为准
+        expected = header_length + _ecc_length((flags & _ECC_MASK) >> _ECC_SHIFT, length)
+        if expected != data_length:
+            logger.warning("长度前缀(%d)与容器头(%d)不一致，以容器头为准", data_length, expected)
+            data_length = expected
+    
+    if data_length <= 0:
+        logger.debug("解析到的数据长度不合理: %d", data_length)
+        return None
+    # 用载体的实际容量检查数据长度是否合理
+    body_offset = _head_slots(header_length, repeated)
+    if _layout_slots(data_length, header_length, k, body_offset) > capacity:
+        logger.debug("解析到的数据长度超出载体容量: %d", data_length)
+        return None
+    return data_length, header_length, k, body_offset
+
+def _layout_slots(data_length, header_length, k, body_offset):
+    """计算按该布局提取全部数据需要的通道/采样总数"""
+    return body_offset + -(-(data_length - header_length) * 8 // k)
+
+def _extract_lazily(read_slots, require_container=False, scatter=None, passphrase=None):
+    """先只读取长度前缀和容器头，确认数据长度与载体容量相符后，再读取数据所在的区域
+
+    read_slots(n)返回(至少包含前n个位置的slots, 载体的通道/采样总数)，
+    能按需读取的载体可以直接返回整个载体的视图。在整个载体内打乱嵌入位置时需要读取整个载体。
+    载荷已加密时先只读取并用认证标签验证第一个加密块，口令缺失或错误时不再读取其余数据。
+    passphrase可以是_passphrase_keys返回的密钥函数，调用方把同一个函数传给_unpack_container时解密不再重新派生密钥。
+    """
+    with _span('decode'):
+        head, capacity = read_slots(_HEAD_SLOTS if scatter is None or scatter[1] else sys.maxsize)
+    
+    # 确保至少有32位用于长度信息
+    if capacity < 32:
+        logger.warning("载体数据不足32位")
+        return b""
+    
+    layout = _payload_layout(head, capacity, scatter)
+    if layout is None:
+        return b""
+    data_length, header_length, k, body_offset = layout
+    if require_container and header_length == 0:
+        logger.debug("没有找到隐写容器")
+        return b""
+    
+    header = b""
+    plan = None
+    if header_length:
+        with _span('decode'):
+            slots = head if head.size >= body_offset else read_slots(body_offset)[0]
+        with _span('extract'):
+            header = _read_head(slots, 32, header_length, body_offset != _head_slots(header_length), scatter)
+        flags = _CONTAINER_HEADER.unpack_from(header)[3]
+        if flags & _ADAPTIVE_FLAG:
+            # 自适应嵌入的位置由整张图片的纹理决定
+            with _span('decode'):
+                slots = read_slots(sys.maxsize)[0]
+            if slots.ndim != 3:
+                logger.warning("载荷按纹理自适应嵌入，但载体不是图片")
+                return b""
+            with _span('plan'):
+                plan = _adaptive_plan(slots, k, body_offset, scatter)
+        block_size = _first_block_size(header)
+        ecc_id = (flags & _ECC_MASK) >> _ECC_SHIFT
+        if block_size is not None and header_length + _ecc_length(ecc_id, block_size) < data_length:
+            # 只读取第一个加密块来验证口令
+            prefix_length = header_length + _ecc_length(ecc_id, block_size)
+            if plan is None:
+                with _span('decode'):
+                    slots = read_slots(_layout_slots(prefix_length, header_length, k, body_offset))[0]
+            with _span('extract'):
+                first_block = _read_body(slots, prefix_length - header_length, k, body_offset, scatter, plan)
+            keys = _passphrase_keys(passphrase)
+            if keys is None or not _passphrase_matches(header, _ecc_decode(first_block, ecc_id, block_size), keys):
+                logger.warning("口令缺失或错误，跳过其余加密数据")
+                return header + first_block
+    
+    if plan is not None:
+        with _span('extract'):
+            return header + _read_body(slots, data_length - header_length, k, body_offset, scatter, plan)
+    
+    # 只读取实际数据所在的区域
+    total_slots_needed = _layout_slots(data_length, header_length, k, body_offset)
+    with _span('decode'):
+        slots = head if head.size >= total_slots_needed else read_slots(total_slots_needed)[0]
+    if slots.size < total_slots_needed:
+        logger.warning("数据不足，需要%d个通道/采样，但只有%d个", total_slots_needed, slots.size)
+        return b""
+    with _span('extract'):
+        return header + _read_lsb(slots, body_offset, data_length - header_length, k, scatter)
+
+def _read_body(slots, n_bytes, k, body_offset, scatter=None, plan=None):
+    """读取容器头之后的n_bytes个字节，plan不为None时按自适应嵌入的顺序读取"""
+    if plan is None:
+        return _read_lsb(slots, body_offset, n_bytes, k, scatter)
+    index, plane = _plan_bits(plan, 0, n_bytes * 8)
+    values = slots.reshape(-1)[index] if slots.flags.c_contiguous else slots[np.unravel_index(index, slots.shape)]
+    return np.packbits((values >> plane) & 1).tobytes()
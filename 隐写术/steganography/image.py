@@ -0,0 +1,466 @@
+"""图片载体：PNG等格式通过Pillow解码，未压缩的BMP、PGM/PPM和TIFF通过内存映射直接读写像素数组"""
+import contextlib
+import io
+import logging
+import os
+import re
+import struct
+import zlib
+import numpy as np
+from PIL import Image
+from .core import (
+    _check_bits, _container_slots, _embed_mapped, _embed_payload, _extract_lazily, _passphrase_keys, _payload_text,
+    _scatter_key, _span, _text_payload, _update_container, _update_mapped
+)
+
+logger = logging.getLogger(__name__)
+
+# 解析未压缩图片时读取的文件头字节数，PGM/PPM的注释较长时会超出该范围，此时交给Pillow解码
+_RAW_HEADER_SIZE = 4096
+# 二进制PGM/PPM的文件头：魔数、宽、高和最大值之间可以有空白和注释，最大值之后是一个空白字符
+_PNM_HEADER = re.compile(rb'P([56])(?:\s|#[^\n]*\n)+(\d+)(?:\s|#[^\n]*\n)+(\d+)(?:\s|#[^\n]*\n)+(\d+)\s')
+# TIFF和BigTIFF的文件头
+_TIFF_MAGICS = (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+')
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# PNG各颜色类型每个像素的采样数
+_PNG_SAMPLES = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# 需要读取的TIFF字段：宽、高、每个采样的位数、压缩、光度解释、条带偏移、每像素采样数、每条带行数、条带字节数、
+# 平面配置、分块宽度、附加采样和采样格式
+_TIFF_TAGS = (256, 257, 258, 259, 262, 273, 277, 278, 279, 284, 322, 338, 339)
+# TIFF字段类型对应的NumPy类型：BYTE、SHORT、LONG、LONG8
+_TIFF_TYPES = {1: 'u1', 3: 'u2', 4: 'u4', 16: 'u8'}
+
+@contextlib.contextmanager
+def _raw_file(image):
+    """以二进制文件的方式读取image，image可以是文件路径、字节串或文件对象，调用方文件对象的读取位置保持不变"""
+    if _is_path(image):
+        with open(image, 'rb') as f:
+            yield f
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(image)
+    else:
+        position = image.tell()
+        image.seek(0)
+        try:
+            yield image
+        finally:
+            image.seek(position)
+
+def _raw_layout(image):
+    """解析未压缩图片的像素数组位置，返回(偏移, (行数, 每行字节数), 采样类型, 视图函数, 扩展名)，不支持时返回None
+
+    视图函数将按行排列的采样数组转换为与Pillow解码结果相同嵌入顺序（自上而下、RGB通道）的(高, 宽, 颜色通道数)视图；
+    支持24/32位BMP、最大值为255或65535的二进制PGM/PPM，以及未压缩、按条带连续存储的8/16位灰度或RGB TIFF（含BigTIFF）。
+    """
+    if isinstance(image, (np.ndarray, Image.Image)):
+        return None
+    try:
+        with _raw_file(image) as f:
+            header = f.read(_RAW_HEADER_SIZE)
+            if header[:2] == b'BM':
+                return _bmp_layout(header)
+            if header[:2] in (b'P5', b'P6'):
+                return _pnm_layout(header)
+            if header[:4] in _TIFF_MAGICS:
+                return _tiff_layout(f, header)
+    except (OSError, ValueError, struct.error) as e:
+        logger.debug("无法解析未压缩图片的像素数组: %s", e)
+    return None
+
+def _bmp_layout(header):
+    """解析未压缩的24/32位BMP，32位BMP的第4个字节不是颜色通道"""
+    if len(header) < 34:
+        return None
+    offset = int.from_bytes(header[10:14], 'little')
+    width = int.from_bytes(header[18:22], 'little', signed=True)
+    height = int.from_bytes(header[22:26], 'little', signed=True)
+    bpp = int.from_bytes(header[28:30], 'little')
+    compression = int.from_bytes(header[30:34], 'little')
+    if bpp not in (24, 32) or compression != 0 or width <= 0 or height == 0:
+        return None
+    n = bpp // 8
+    rows = abs(height)
+    
+    def view(samples):
+        # 每行自底向上存储时翻转行顺序，BGR通道翻转为RGB
+        pixels = samples[:, :width * n].reshape(rows, width, n)[:, :, 2::-1]
+        return pixels[::-1] if height > 0 else pixels
+    return offset, (rows, (width * n + 3) // 4 * 4), np.dtype(np.uint8), view, ('.bmp',)
+
+def _pnm_layout(header):
+    """解析二进制PGM/PPM，16位采样为大端序；其他最大值的采样会被Pillow缩放，不通过内存映射处理"""
+    match = _PNM_HEADER.match(header)
+    if match is None:
+        return None
+    channels = 1 if match.group(1) == b'5' else 3
+    width, height, maxval = (int(group) for group in match.groups()[1:])
+    if maxval not in (255, 65535) or width == 0 or height == 0:
+        return None
+    dtype = np.dtype(np.uint8 if maxval == 255 else '>u2')
+    return (match.end(), (height, width * channels * dtype.itemsize), dtype,
+            lambda samples: samples.reshape(height, width, channels), ('.pgm', '.ppm', '.pnm'))
+
+def _tiff_layout(f, header):
+    """解析TIFF的第一幅图像，只支持未压缩、单平面、条带在文件中连续存储的8/16位无符号灰度或RGB图像（可带alpha通道）"""
+    order = '<' if header[:2] == b'II' else '>'
+    byteorder = 'little' if order == '<' else 'big'
+    if header[2:4] in (b'+\x00', b'\x00+'):
+        count_size, entry_size, value_size = 8, 20, 8
+        ifd = int.from_bytes(header[8:16], byteorder)
+    else:
+        count_size, entry_size, value_size = 2, 12, 4
+        ifd = int.from_bytes(header[4:8], byteorder)
+    f.seek(ifd)
+    n_entries = int.from_bytes(f.read(count_size), byteorder)
+    entries = f.read(n_entries * entry_size)
+    tags = {}
+    for start in range(0, len(entries) - entry_size + 1, entry_size):
+        tag, type_id = struct.unpack(order + 'HH', entries[start:start + 4])
+        if tag not in _TIFF_TAGS or type_id not in _TIFF_TYPES:
+            continue
+        dtype = np.dtype(order + _TIFF_TYPES[type_id])
+        count = int.from_bytes(entries[start + 4:start + 4 + value_size], byteorder)
+        value = entries[start + 4 + value_size:start + entry_size]
+        if count * dtype.itemsize > value_size:
+            # 值放不下时字段中保存的是值所在的偏移
+            f.seek(int.from_bytes(value, byteorder))
+            value = f.read(count * dtype.itemsize)
+        tags[tag] = np.frombuffer(value, dtype, count)
+    
+    def field(tag, default):
+        return int(tags[tag][0]) if tag in tags and tags[tag].size else default
+    width, height = field(256, 0), field(257, 0)
+    samples_per_pixel = field(277, 1)
+    bits = set(tags[258].tolist()) if 258 in tags else {1}
+    photometric = field(262, -1)
+    # 灰度/RGB之外的附加采样只能是非预乘的alpha通道，预乘alpha和白色为0的灰度图会被Pillow改变采样值
+    colors = 1 if photometric == 1 else 3 if photometric == 2 else 0
+    alpha = samples_per_pixel - colors
+    if (width == 0 or height == 0 or field(259, 1) != 1 or field(284, 1) != 1 or 322 in tags
+            or field(339, 1) != 1 or bits not in ({8}, {16}) or colors == 0
+            or alpha not in (0, 1) or alpha and field(338, 0) != 2 or 273 not in tags):
+        return None
+    dtype = np.dtype(np.uint8 if bits == {8} else order + 'u2')
+    row_bytes = width * samples_per_pixel * dtype.itemsize
+    rows_per_strip = min(field(278, height), height)
+    offsets = tags[273].astype(np.int64)
+    # 条带必须首尾相接，整幅图像的像素数组才是文件中连续的一段
+    if offsets.size != -(-height // rows_per_strip) or np.any(
+            offsets != offsets[0] + np.arange(offsets.size) * rows_per_strip * row_bytes):
+        return None
+    if 279 in tags and int(tags[279].astype(np.int64).sum()) < height * row_bytes:
+        return None
+    return (int(offsets[0]), (height, row_bytes), dtype,
+            lambda samples: samples.reshape(height, width, samples_per_pixel)[:, :, :colors], ('.tif', '.tiff'))
+
+def _map_raw(image, layout, mode='r'):
+    """映射未压缩图片的像素数组：文件路径通过内存映射按需读取，字节串直接使用其中的数据，文件对象读入内存"""
+    offset, shape = layout[:2]
+    if _is_path(image):
+        return np.memmap(image, dtype=np.uint8, mode=mode, offset=offset, shape=shape)
+    with _raw_file(image) as f:
+        data = image if isinstance(image, (bytes, bytearray, memoryview)) else f.read()
+    return np.frombuffer(data, dtype=np.uint8, count=shape[0] * shape[1], offset=offset).reshape(shape)
+
+def _raw_slots(mm, layout):
+    """返回每个采样最低有效字节组成的(高, 宽, 颜色通道数)视图，16位采样的最低位就在低字节中"""
+    dtype, view = layout[2:4]
+    low = dtype.itemsize - 1 if dtype.str[0] == '>' else 0
+    return view(mm[:, low::dtype.itemsize])
+
+def _raw_values(mm, layout):
+    """返回采样值组成的(高, 宽, 颜色通道数)视图"""
+    dtype, view = layout[2:4]
+    return view(mm.view(dtype))
+
+# 隐写时保持原样的图片模式，其他模式先转换为RGB/RGBA（二值图转换为灰度图）
+_KEPT_MODES = ('L', 'LA', 'RGB', 'RGBA', 'I;16')
+# PNG的zlib压缩策略，Pillow总是逐行自适应地选择PNG过滤器，策略决定过滤后的数据如何压缩
+_PNG_STRATEGIES = {'default': 0, 'filtered': 1, 'huffman': 2, 'rle': 3, 'fixed': 4}
+# 保存PNG时的压缩参数，由configure_png设置
+_png_options = {'compress_level': 6, 'compress_type': 0, 'optimize': False}
+
+def configure_png(compress_level=6, strategy='default', optimize=False):
+    """设置隐写输出PNG的压缩参数，只对当前进程有效
+
+    compress_level为zlib压缩级别（0-9），级别越低编码越快、文件越大；strategy为zlib压缩策略：'default'、'filtered'、
+    'huffman'、'rle'或'fixed'，最低位隐写后的像素噪声较多，'rle'和'huffman'往往以很小的体积代价换来快得多的编码；
+    optimize为True时Pillow额外搜索最小的编码，速度很慢。各种设置的耗时和文件大小见benchmarks/bench_png.py。
+    """
+    if not 0 <= compress_level <= 9:
+        raise ValueError("PNG压缩级别必须在0到9之间")
+    if strategy not in _PNG_STRATEGIES:
+        raise ValueError(f"不支持的PNG压缩策略: {strategy}")
+    _png_options.update(compress_level=compress_level, compress_type=_PNG_STRATEGIES[strategy], optimize=optimize)
+
+def _is_path(image):
+    """判断image是否为文件路径"""
+    return isinstance(image, (str, os.PathLike))
+
+@contextlib.contextmanager
+def _opened(image):
+    """打开图片，image可以是文件路径、文件对象、字节串、NumPy数组或PIL图片；调用方传入的PIL图片不会被关闭"""
+    if isinstance(image, Image.Image):
+        yield image
+        return
+    if isinstance(image, np.ndarray):
+        img = Image.fromarray(image)
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        img = Image.open(io.BytesIO(image))
+    else:
+        img = Image.open(image)
+    with img:
+        yield img
+
+def _normalized_mode(img):
+    """返回隐写使用的图片模式：灰度、RGB、带alpha通道和16位灰度的图片保持原有模式，二值图为灰度，其他为RGB或RGBA"""
+    if img.mode in _KEPT_MODES:
+        return img.mode
+    if img.mode.startswith('I;16') or img.mode == 'I' and img.format == 'PPM':
+        # 大端序的16位灰度图和16位PGM（Pillow解码为32位整数）统一为I;16，保持位深
+        return 'I;16'
+    if img.mode == '1':
+        return 'L'
+    return 'RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB'
+
+def _color_channels(mode):
+    """返回隐写使用的颜色通道数，alpha通道不用于隐写"""
+    return 1 if mode in ('L', 'LA', 'I;16') else 3
+
+def _color_view(pixels, mode):
+    """返回像素数组中颜色通道的视图，形状为(高, 宽, 颜色通道数)，按行、列、通道的顺序嵌入"""
+    return pixels.reshape(pixels.shape[0], pixels.shape[1], -1)[:, :, :_color_channels(mode)]
+
+def _save_image(img, output_path, source):
+    """保存隐写后的图片，返回实际保存的位置
+
+    output_path为路径时强制保存为PNG；为文件对象时写入PNG并返回该对象；为None时，
+    source（调用方传入的载体）为NumPy数组则返回数组，为PIL图片则返回图片，否则返回PNG文件的字节串。
+    """
+    if output_path is None and isinstance(source, np.ndarray):
+        return np.asarray(img)
+    if output_path is None and isinstance(source, Image.Image):
+        return img
+    
+    # 保留ICC色彩配置和分辨率
+    options = dict(_png_options)
+    for key in ('icc_profile', 'dpi'):
+        if key in img.info:
+            options[key] = img.info[key]
+    if output_path is None or not _is_path(output_path):
+        buffer = io.BytesIO() if output_path is None else output_path
+        with _span('save'):
+            img.save(buffer, format='PNG', **options)
+        return buffer.getvalue() if output_path is None else output_path
+    
+    # 强制使用PNG格式，无论用户选择什么格式
+    output_path_png = os.path.splitext(output_path)[0] + '.png'
+    with _span('save'):
+        img.save(output_path_png, format='PNG', **options)
+    
+    # 如果用户要求的不是PNG格式，提供警告
+    if output_path != output_path_png:
+        logger.warning("已将输出格式更改为PNG以确保数据不丢失。原始请求格式(%s)会导致隐写数据丢失。", os.path.splitext(output_path)[1])
+    return output_path_png
+
+def _hide_payload(image_path, output_path, payload, bits_per_channel=1, password=None):
+    """将载荷隐藏到图片中，每个颜色通道使用最低bits_per_channel位，返回实际保存的位置
+
+    image_path可以是文件路径、文件对象、字节串、NumPy数组或PIL图片，output_path可以是文件路径、文件对象或None，见_save_image。
+    图片保持原有的模式、alpha通道和位深（调色板图片除外），alpha通道不用于隐写。
+    """
+    _check_bits(bits_per_channel)
+    scatter = _scatter_key(password)
+    layout = _raw_layout(image_path) if _is_path(image_path) else None
+    if layout and _is_path(output_path) and os.path.splitext(output_path)[1].lower() in layout[4]:
+        # 未压缩的BMP、PGM/PPM和TIFF保存为同一格式时，复制载体后通过内存映射只修改载荷所在的行，
+        # 其余像素原样复制，无需解码整张图片，内存占用与图片大小无关；16位采样保持16位
+        if _container_slots(payload, bits_per_channel) > _raw_slots(_map_raw(image_path, layout), layout).size:
+            raise ValueError("图片容量不足以隐藏所有数据")
+        length = _embed_mapped(image_path, output_path, layout[0], layout[1], lambda mm: _raw_slots(mm, layout),
+                               payload, bits_per_channel, scatter)
+        logger.info("成功隐藏数据，长度: %d字节，保存到: %s", length, output_path)
+        return output_path
+    
+    # 转换为numpy数组，调色板等模式先转换为RGB/RGBA，其余模式保持不变
+    with _span('decode'), _opened(image_path) as img:
+        mode = _normalized_mode(img)
+        img_array = np.array(img if img.mode == mode else img.convert(mode))
+        info = dict(img.info)
+    slots = _color_view(img_array, mode)
+    
+    # 检查图片容量是否足够
+    if _container_slots(payload, bits_per_channel) > slots.size:
+        raise ValueError("图片容量不足以隐藏所有数据")
+    
+    # 按行、列、颜色通道的顺序写入最低有效位
+    length = _embed_payload(slots, payload, bits_per_channel, scatter)
+    output_img = Image.fromarray(img_array)
+    output_img.info.update(info)
+    saved = _save_image(output_img, output_path, image_path)
+    logger.info("成功隐藏数据，长度: %d字节", length)
+    return saved
+
+def _update_payload(image_path, output_path, build, password=None):
+    """改写图片中已有的容器，返回修改后的文件路径，见core._update_container
+
+    未压缩的BMP、PGM/PPM和TIFF保存为同一格式时通过内存映射只修改变化的像素；其他格式解码整张图片，
+    改写后重新编码为PNG，原地更新且内容没有变化时不重新编码。
+    """
+    scatter = _scatter_key(password)
+    target = image_path if output_path is None else output_path
+    layout = _raw_layout(image_path)
+    if layout and os.path.splitext(target)[1].lower() in layout[4]:
+        return _update_mapped(image_path, output_path, layout[0], layout[1], lambda mm: _raw_slots(mm, layout),
+                              build, scatter)
+    
+    with _span('decode'), _opened(image_path) as img:
+        mode = _normalized_mode(img)
+        img_array = np.array(img if img.mode == mode else img.convert(mode))
+        info = dict(img.info)
+    if not _update_container(_color_view(img_array, mode), build, scatter) and output_path is None:
+        return image_path
+    output_img = Image.fromarray(img_array)
+    output_img.info.update(info)
+    return _save_image(output_img, target, image_path)
+
+def hide_text_in_image(image_path, output_path, text, bits_per_channel=1, password=None):
+    """在图片中隐藏文本，bits_per_channel为每个颜色通道使用的最低位数（1-4）
+
+    image_path可以是文件路径、文件对象、字节串、NumPy数组或PIL图片；output_path为None时，
+    NumPy数组和PIL图片返回同类型的结果，其他输入返回PNG文件的字节串。
+    """
+    return _hide_payload(image_path, output_path, _text_payload(text), bits_per_channel, password)
+
+def _read_slots(image_path, n_slots):
+    """读取图片中至少包含前n_slots个通道的slots，返回(slots, 通道总数)
+
+    未压缩的BMP、PGM/PPM和TIFF通过内存映射按需读取；保持原有模式的非隔行扫描PNG只需要前四分之一以内的行时只解压和解码这些行；其他情况解码整张图片。
+    """
+    layout = _raw_layout(image_path)
+    if layout:
+        slots = _raw_slots(_map_raw(image_path, layout), layout)
+        return slots, slots.size
+    
+    with _opened(image_path) as img:
+        width, height = img.size
+        mode = _normalized_mode(img)
+        channels = _color_channels(mode)
+        rows = min(height, -(-n_slots // (width * channels)))
+        img_array = None
+        # 调用方传入的PIL图片已经打开，不再从头读取；需要超过四分之一的行时重新封装的开销超过节省的解码，直接解码整张图片
+        if (img is not image_path and img.format == 'PNG' and img.mode == mode and not img.info.get('interlace')
+                and rows * 4 <= height):
+            img_array = _png_rows(image_path, rows, mode)
+        if img_array is None:
+            img_array = np.array(img if img.mode == mode else img.convert(mode))
+    return _color_view(img_array, mode), width * height * channels
+
+def _png_chunk(chunk_type, data):
+    """生成一个PNG数据块：长度、类型、数据和CRC32"""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+def _png_rows(image, rows, mode):
+    """只解码非隔行扫描PNG的前rows行，返回像素数组，无法截断时返回None
+
+    PNG的像素数据按行滤波后整体压缩，zlib解压出前rows行就停止，其余IDAT数据块不再读取；
+    这些行连同IDAT之前的数据块（调色板、透明度、色彩配置等）重新封装为高度为rows的PNG（zlib存储块，不再压缩），
+    交给Pillow按公开接口解码和反滤波。
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        f = io.BytesIO(image)
+    elif isinstance(image, (str, os.PathLike)):
+        f = open(image, 'rb')
+    else:
+        f = image
+        # 与Image.open一样从文件对象的开头读取
+        f.seek(0)
+    try:
+        if f.read(8) != _PNG_SIGNATURE:
+            return None
+        chunks = [_PNG_SIGNATURE]
+        decompressor = zlib.decompressobj()
+        raw = bytearray()
+        needed = None
+        while needed is None or len(raw) < needed:
+            head = f.read(8)
+            if len(head) < 8:
+                return None
+            length, chunk_type = struct.unpack('>I4s', head)
+            if chunk_type == b'IHDR':
+                width, height, depth, color, compression, filtering, interlace = struct.unpack('>IIBBBBB', f.read(13))
+                f.read(length - 13 + 4)
+                if interlace or color not in _PNG_SAMPLES:
+                    return None
+                needed = rows * (1 + (width * _PNG_SAMPLES[color] * depth + 7) // 8)
+                chunks.append(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, rows, depth, color, compression,
+                                                             filtering, 0)))
+            elif chunk_type == b'IDAT' and needed is not None:
+                raw += decompressor.decompress(f.read(length), needed - len(raw))
+                f.read(4)
+            elif chunk_type in (b'IDAT', b'IEND'):
+                return None
+            else:
+                chunks.append(head + f.read(length + 4))
+    finally:
+        if f is not image:
+            f.close()
+    # 数据较多时不拼接IDAT数据块，各部分最后只合并一次
+    data = zlib.compress(raw, 0)
+    chunks += [struct.pack('>I', len(data)), b'IDAT', data, struct.pack('>I', zlib.crc32(data, zlib.crc32(b'IDAT'))),
+               _png_chunk(b'IEND', b'')]
+    with Image.open(io.BytesIO(b''.join(chunks))) as img:
+        if img.mode != mode or img.size[1] != rows:
+            return None
+        return np.array(img)
+
+def _extract_bytes(image_path, scatter=None, passphrase=None):
+    """从图片中提取隐藏的原始数据"""
+    try:
+        return _extract_lazily(lambda n_slots: _read_slots(image_path, n_slots), scatter=scatter, passphrase=passphrase)
+    except Exception as e:
+        logger.error("图片提取错误: %s", e)
+        return b""
+
+def extract_from_image(image_path, password=None, passphrase=None):
+    """从图片中提取隐藏文本"""
+    keys = _passphrase_keys(passphrase)
+    return _payload_text(_extract_bytes(image_path, _scatter_key(password), keys), keys)
+
+def _carrier_scatter(image_path, password):
+    """生成提取图片时使用的打乱密钥"""
+    return _scatter_key(password)
+
+def _carrier_slots(image_path):
+    """只读取文件头，计算图片可用于隐写的颜色通道数"""
+    layout = _raw_layout(image_path)
+    if layout:
+        return _raw_slots(_map_raw(image_path, layout), layout).size
+    with _opened(image_path) as img:
+        width, height = img.size
+        mode = _normalized_mode(img)
+    return width * height * _color_channels(mode)
+
+def _sample_tiles(image_path, tile_samples):
+    """按行分块产出图片的像素值，每块为(行数*通道数, 宽)的数组，每行是同一通道中水平相邻的像素
+
+    未压缩的BMP、PGM/PPM和TIFF通过内存映射逐块读取；其他格式先解码整张图片，灰度图只有一个通道，其余按RGB通道分析。
+    """
+    layout = _raw_layout(image_path)
+    if layout:
+        pixels = _raw_values(_map_raw(image_path, layout), layout)
+    else:
+        with _opened(image_path) as img:
+            mode = _normalized_mode(img)
+            pixels = _color_view(np.asarray(img if img.mode == mode else img.convert(mode)), mode)
+    height, width, channels = pixels.shape
+    rows = max(1, tile_samples // (width * channels))
+    for start in range(0, height, rows):
+        tile = pixels[start:start + rows]
+        yield tile.transpose(0, 2, 1).reshape(-1, width)
+
+# 注册到载体后端注册表的函数，见api.register_backend
+BACKEND = {
+    'capacity': _carrier_slots, 'embed': _hide_payload, 'extract': _extract_bytes, 'probe': _read_slots,
+    'scatter': _carrier_scatter, 'samples': _sample_tiles, 'update': _update_payload, 'buffers': True, 'adaptive': True
+}
@@ -0,0 +1,258 @@
+"""视频载体：通过OpenCV逐帧读写，所有帧组成一个连续的隐写空间，输出使用无损编码的AVI"""
+import logging
+import os
+import sys
+import numpy as np
+from .core import (
+    _CONTAINER_HEADER, _ECC_CODES, _bits_to_values, _bytes_to_bits, _check_bits, _extract_lazily, _head_bits,
+    _name_field, _pack_container, _passphrase_keys, _payload_text, _report_progress, _scatter_key, _span, _text_payload,
+    _write_lsb
+)
+
+logger = logging.getLogger(__name__)
+
+# 依次尝试的无损编码，保证帧像素的最低位在编码后保持不变
+_LOSSLESS_FOURCCS = ('FFV1', 'HFYU')
+
+def _open_video(video_path):
+    """打开视频文件，返回(cv2模块, VideoCapture对象)"""
+    try:
+        import cv2
+    except ImportError:
+        raise ImportError("需要安装opencv-python库来处理视频")
+    
+    video = cv2.VideoCapture(video_path)
+    if not video.isOpened():
+        raise ValueError("无法打开视频文件")
+    return cv2, video
+
+def _body_values(body, k, start, stop):
+    """计算载荷内容中第start到stop个位置（每个位置k位）要写入的值，只展开涉及的字节"""
+    bit_start = start * k
+    bit_stop = stop * k
+    byte_start = bit_start // 8
+    bits = _bytes_to_bits(body[byte_start:-(-bit_stop // 8)])[bit_start - byte_start * 8:]
+    # 最后不足k位的部分补0
+    bits = np.concatenate([bits, np.zeros(bit_stop - bit_start - len(bits), dtype=np.uint8)])
+    return _bits_to_values(bits, k)
+
+def _hide_payload(video_path, output_path, payload, bits_per_channel=1, password=None):
+    """将载荷分散隐藏到视频的连续多帧中，并使用无损编码保存，返回实际保存的文件路径
+
+    所有帧按帧、行、列、BGR通道的顺序组成一个连续的隐写空间，长度前缀和容器头使用最低1位，
+    载荷内容使用最低bits_per_channel位。
+    """
+    _check_bits(bits_per_channel)
+    cv2, video = _open_video(video_path)
+    try:
+        # 获取视频信息
+        fps = video.get(cv2.CAP_PROP_FPS) or 25
+        width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_slots = width * height * 3
+        scatter = _scatter_key(password, frame_slots)
+        
+        # 视频需要逐帧写出，先在内存中封装完整容器，再按帧取出各自要写入的部分
+        with _span('pack'):
+            container = _pack_container(payload, bits_per_channel)
+        header_length = _CONTAINER_HEADER.size + len(_name_field(payload))
+        head_bits = _head_bits(len(container), container[:header_length], _ECC_CODES.get(payload.get('ecc'), 0))
+        body = container[header_length:]
+        body_slots = -(-len(body) * 8 // bits_per_channel)
+        total_slots = len(head_bits) + body_slots
+        
+        # 检查视频容量是否足够（部分格式无法获得准确帧数，此时在写入过程中检查）
+        if frame_count > 0 and total_slots > frame_count * frame_slots:
+            raise ValueError("视频容量不足以隐藏所有数据")
+        
+        # 强制使用无损编码的AVI格式，有损编码会破坏隐写数据
+        output_path_avi = os.path.splitext(output_path)[0] + '.avi'
+        for fourcc in _LOSSLESS_FOURCCS:
+            out = cv2.VideoWriter(output_path_avi, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+            if out.isOpened():
+                break
+            out.release()
+        else:
+            raise ValueError("当前OpenCV不支持无损视频编码（FFV1/HuffYUV）")
+        
+        written = 0
+        frames = 0
+        try:
+            while True:
+                with _span('decode'):
+                    success, frame = video.read()
+                if not success:
+                    break
+                frames += 1
+                if written < total_slots:
+                    flat = frame.reshape(-1)
+                    # 长度前缀和容器头部分
+                    if written < len(head_bits):
+                        with _span('embed'):
+                            _write_lsb(flat, 0, head_bits[written:written + frame_slots], scatter=scatter)
+                    # 载荷内容部分
+                    start = max(written, len(head_bits)) - len(head_bits)
+                    stop = min(written + frame_slots - len(head_bits), body_slots)
+                    if stop > start:
+                        with _span('pack'):
+                            values = _body_values(body, bits_per_channel, start, stop)
+                        with _span('embed'):
+                            _write_lsb(flat, start + len(head_bits) - written, values, bits_per_channel, scatter)
+                    written += frame_slots
+                with _span('encode'):
+                    out.write(frame)
+                _report_progress('frames', frames, frame_count or None)
+        finally:
+            out.release()
+        
+        if written < total_slots:
+            os.remove(output_path_avi)
+            raise ValueError("视频容量不足以隐藏所有数据")
+    finally:
+        video.release()
+    
+    logger.info("成功在视频中隐藏数据，使用%d帧，保存到: %s", -(-total_slots // frame_slots), output_path_avi)
+    
+    # 如果用户要求的不是AVI格式，提供警告
+    if output_path != output_path_avi:
+        logger.warning("已将输出格式更改为无损编码的AVI以确保数据不丢失。原始请求格式(%s)会导致隐写数据丢失。", os.path.splitext(output_path)[1])
+    
+    return output_path_avi
+
+def hide_text_in_video(video_path, output_path, text, bits_per_channel=1, password=None):
+    """在视频中隐藏文本，bits_per_channel为每个通道使用的最低位数（1-4）"""
+    return _hide_payload(video_path, output_path, _text_payload(text), bits_per_channel, password)
+
+def _video_frame_slots(video_path):
+    """返回视频每帧的通道数"""
+    cv2, video = _open_video(video_path)
+    try:
+        return int(video.get(cv2.CAP_PROP_FRAME_WIDTH)) * int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)) * 3
+    finally:
+        video.release()
+
+def _read_slots(video_path, n_slots):
+    """从头逐帧读取视频，读够n_slots个通道后立即停止，返回(slots, 通道总数)"""
+    cv2, video = _open_video(video_path)
+    try:
+        frame_slots = int(video.get(cv2.CAP_PROP_FRAME_WIDTH)) * int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)) * 3
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        # 部分格式无法获得准确帧数，此时不按容量限制数据长度
+        capacity = frame_count * frame_slots if frame_count > 0 else sys.maxsize
+        parts = []
+        have = 0
+        while have < n_slots:
+            success, frame = video.read()
+            if not success:
+                break
+            # 每个位置最多使用最低4位
+            parts.append(frame.reshape(-1) & 0x0F)
+            have += parts[-1].size
+            _report_progress('frames', len(parts), frame_count or None)
+    finally:
+        video.release()
+    if not parts:
+        return np.zeros(0, dtype=np.uint8), 0
+    return np.concatenate(parts), capacity
+
+def _extract_bytes(video_path, scatter=None, passphrase=None):
+    """逐帧读取视频并提取隐藏的原始数据，读够数据所在的帧后立即停止"""
+    try:
+        # 视频帧中只会嵌入容器格式的数据
+        return _extract_lazily(lambda n_slots: _read_slots(video_path, n_slots), True, scatter, passphrase)
+    except Exception as e:
+        logger.error("视频提取错误: %s", e)
+        return b""
+
+def _find_legacy_video_carrier(carrier_path):
+    """查找旧版本视频隐写生成的PNG载体文件，找不到时返回None"""
+    # 尝试多种可能的PNG载体文件路径
+    possible_paths = []
+    
+    # 1. 基本路径 - 与视频同目录
+    basic_path = os.path.splitext(carrier_path)[0] + "_carrier.png"
+    possible_paths.append(basic_path)
+    
+    # 2. 如果路径包含uploads目录，尝试在uploads目录中查找
+    if 'uploads' in carrier_path:
+        uploads_dir = os.path.join(os.path.dirname(os.path.dirname(carrier_path)), 'uploads')
+        basename = os.path.basename(os.path.splitext(carrier_path)[0]) + "_carrier.png"
+        uploads_path = os.path.join(uploads_dir, basename)
+        possible_paths.append(uploads_path)
+    
+    # 3. 尝试当前工作目录
+    cwd_path = os.path.join(os.getcwd(), os.path.basename(os.path.splitext(carrier_path)[0]) + "_carrier.png")
+    possible_paths.append(cwd_path)
+    
+    # 4. 尝试uploads子目录
+    uploads_subdir_path = os.path.join('uploads', os.path.basename(os.path.splitext(carrier_path)[0]) + "_carrier.png")
+    possible_paths.append(uploads_subdir_path)
+    
+    # 5. 处理中文编码问题 - 尝试查找目录中所有可能匹配的文件
+    dir_path = os.path.dirname(carrier_path)
+    if os.path.exists(dir_path):
+        for file in os.listdir(dir_path):
+            if file.endswith("_carrier.png"):
+                # 检查文件名是否可能是编码不一致的版本
+                possible_match = os.path.join(dir_path, file)
+                possible_paths.append(possible_match)
+    
+    # 6. 在uploads目录中查找所有可能匹配的文件
+    uploads_dir = 'uploads'
+    if os.path.exists(uploads_dir):
+        for file in os.listdir(uploads_dir):
+            if file.endswith("_carrier.png"):
+                possible_match = os.path.join(uploads_dir, file)
+                possible_paths.append(possible_match)
+    
+    # 打印所有可能的路径以便调试
+    logger.debug("正在查找PNG载体文件，尝试以下路径:")
+    for path in possible_paths:
+        logger.debug("- %s", path)
+    
+    # 尝试所有可能的路径
+    for path in possible_paths:
+        if os.path.exists(path):
+            logger.info("找到PNG载体图像: %s", path)
+            return path
+    return None
+
+def _extract_or_legacy(video_path, scatter=None, passphrase=None):
+    """提取视频中的原始数据；视频帧中没有数据且未使用密码时，查找旧版本视频隐写生成的PNG载体"""
+    extracted_data = _extract_bytes(video_path, scatter, passphrase)
+    if extracted_data or scatter is not None:
+        return extracted_data
+    # 视频帧本身携带全部数据；旧版本的视频只能依靠对应的PNG载体文件
+    png_carrier_path = _find_legacy_video_carrier(video_path)
+    if png_carrier_path is None:
+        logger.warning("视频帧中没有隐藏数据，也未找到旧版本的PNG载体图像")
+        return extracted_data
+    logger.info("从旧版本的PNG载体中提取数据...")
+    from . import image
+    return image._extract_bytes(png_carrier_path)
+
+def extract_from_video(video_path, password=None, passphrase=None):
+    """从视频中提取隐藏文本"""
+    keys = _passphrase_keys(passphrase)
+    return _payload_text(_extract_bytes(video_path, _carrier_scatter(video_path, password), keys), keys)
+
+def _carrier_scatter(video_path, password):
+    """生成提取视频时使用的打乱密钥，视频只在每帧内部打乱"""
+    return _scatter_key(password, _video_frame_slots(video_path)) if password is not None else None
+
+def _carrier_slots(video_path):
+    """只读取文件头，计算视频所有帧可用于隐写的通道数"""
+    cv2, video = _open_video(video_path)
+    try:
+        width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return max(0, int(video.get(cv2.CAP_PROP_FRAME_COUNT))) * width * height * 3
+    finally:
+        video.release()
+
+# 注册到载体后端注册表的函数，见api.register_backend
+BACKEND = {
+    'capacity': _carrier_slots, 'embed': _hide_payload, 'extract': _extract_or_legacy, 'probe': _read_slots,
+    'scatter': _carrier_scatter
+}